@@ -58,6 +58,17 @@ usage: bids2table [-h] [--output OUTPUT] [--incremental] [--overwrite] [--worker
 
 See `bids2table --help` for more information.
 
+### Deferred metadata loading
+
+Loading the JSON sidecar metadata often dominates indexing time. For large datasets, it
+can be much faster to index without metadata, filter the table down to the files you
+need, and only then load their metadata with `bids2table.hydrate_metadata`.
+
+```python
+tab = bids2table("path/to/dataset", with_meta=False)
+tab = hydrate_metadata(tab.filter("task", "rest"))
+```
+
 ## Table representation
 
 The generated index is represented as a `bids2table.BIDSTable`, which is just a subclass
@@ -140,8 +151,14 @@ import elbow.dtypes  # noqa
 
 from ._b2t import bids2table
 from ._version import __version__, __version_tuple__  # noqa
-from .entities import BIDSEntities, parse_bids_entities
-from .table import BIDSFile, BIDSTable, join_bids_path
+from .entities import BIDSEntities, parse_bids_entities, parse_bids_entities_batch
+from .table import (
+    BIDSFile,
+    BIDSTable,
+    hydrate_metadata,
+    join_bids_path,
+    join_bids_paths,
+)
 
 __all__ = [
     "bids2table",
@@ -149,5 +166,8 @@ __all__ = [
     "BIDSFile",
     "BIDSEntities",
     "parse_bids_entities",
+    "parse_bids_entities_batch",
     "join_bids_path",
+    "join_bids_paths",
+    "hydrate_metadata",
 ]
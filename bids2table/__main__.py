@@ -47,6 +47,15 @@ def main():
         "Incompatible with --overwrite. (default: None)",
         default=None,
     )
+    parser.add_argument(
+        "--threads",
+        "-t",
+        metavar="COUNT",
+        type=int,
+        help="Number of threads used to load the JSON sidecar metadata in each "
+        "subject directory. Can be combined with --workers. (default: 1)",
+        default=1,
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -74,6 +83,7 @@ def main():
         overwrite=args.overwrite,
         workers=args.workers,
         worker_id=args.worker_id,
+        threads=args.threads,
         exclude=args.exclude,
         return_table=False,
     )
@@ -1,4 +1,5 @@
 import logging
+import os
 from functools import partial
 from pathlib import Path
 from typing import List, Optional
@@ -7,7 +8,9 @@ from elbow.builders import build_parquet, build_table
 from elbow.sources.filesystem import Crawler
 from elbow.typing import StrOrPath
 
+from bids2table.entities import load_entities_cache, save_entities_cache
 from bids2table.extractors.bids import extract_bids_subdir
+from bids2table.extractors.dataset import prefetch_dataset_descriptions
 from bids2table.table import BIDSTable
 
 logger = logging.getLogger("bids2table")
@@ -24,7 +27,9 @@ def bids2table(
     overwrite: bool = False,
     workers: Optional[int] = None,
     worker_id: Optional[int] = None,
+    threads: int = 1,
     return_table: bool = True,
+    cache_entities: bool = False,
 ) -> Optional[BIDSTable]:
     """
     Index a BIDS dataset directory and load as a pandas DataFrame.
@@ -45,8 +50,13 @@ def bids2table(
         worker_id: optional worker ID to use when scheduling parallel tasks externally.
             Specifying the number of workers is required in this case. Incompatible with
             overwrite.
+        threads: number of threads used to load the JSON sidecar metadata for the
+            files in each subject directory concurrently. Can be combined with
+            `workers`, which parallelize over subjects.
         return_table: whether to return the BIDS table or just build the persistent
             index.
+        cache_entities: reuse parsed BIDS entities from previous runs, persisted under
+            `~/.cache/bids2table`. Only entities parsed in the main process are saved.
 
     Returns:
         A `BIDSTable` representing the indexed dataset(s), or `None` if `return_table`
@@ -69,7 +79,9 @@ def bids2table(
         dirs_only=True,
         follow_links=True,
     )
-    extract = partial(extract_bids_subdir, exclude=exclude, with_meta=with_meta)
+    extract = partial(
+        extract_bids_subdir, exclude=exclude, with_meta=with_meta, workers=threads
+    )
 
     if index_path is None:
         index_path = root / "index.b2t"
@@ -86,6 +98,14 @@ def bids2table(
             tab = None
         return tab
 
+    # Load the descriptions for the top-level dataset and any nested derivatives
+    # datasets up front, concurrently.
+    prefetch_dataset_descriptions([root, *_list_dirs(root / "derivatives")])
+
+    if cache_entities:
+        num_cached = load_entities_cache()
+        logger.info("Loaded %d cached entities", num_cached)
+
     if not persistent:
         logger.info("Building index in memory")
         df = build_table(
@@ -94,6 +114,8 @@ def bids2table(
             workers=workers,
             worker_id=worker_id,
         )
+        if cache_entities:
+            save_entities_cache()
         tab = BIDSTable.from_df(df)
         return tab
 
@@ -109,5 +131,19 @@ def bids2table(
         path_column="file__file_path",
         mtime_column="file__mod_time",
     )
+    if cache_entities:
+        save_entities_cache()
     tab = BIDSTable.from_parquet(index_path) if return_table else None
     return tab
+
+
+def _list_dirs(path: Path) -> List[Path]:
+    """
+    List the immediate sub-directories of ``path``, or an empty list if ``path`` is
+    not a directory.
+    """
+    try:
+        with os.scandir(path) as it:
+            return [Path(entry.path) for entry in it if entry.is_dir()]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
@@ -2,13 +2,27 @@
 A structured representation for BIDS entities.
 """
 
-import re
+import hashlib
+import os
+import pickle
+import sys
 import warnings
-from dataclasses import asdict, dataclass, field, fields, make_dataclass
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
 from functools import lru_cache
 from pathlib import Path
 from types import MappingProxyType
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import bidsschematools.schema
 import pandas as pd
@@ -36,6 +50,11 @@ def _get_bids_schema() -> Any:
 
 BIDS_DATATYPES = tuple(o.value for o in _get_bids_schema().objects.datatypes.values())
 
+BIDS_DATATYPES_SET = frozenset(BIDS_DATATYPES)
+
+# Matches the closest parent directory named for a BIDS datatype.
+_DATATYPE_PATTERN = f"^(?:.*/)?({'|'.join(BIDS_DATATYPES)})/"
+
 
 def bids_field(
     name: str,
@@ -65,7 +84,16 @@ def bids_field(
     return fld
 
 
-@dataclass
+# Entities which are formatted specially in paths, rather than as "{key}-{value}".
+_PATH_SPECIAL_KEYS = frozenset({"datatype", "suffix", "ext"})
+
+# Use slots where supported to drop the per-instance __dict__.
+_DATACLASS_KWARGS: Dict[str, Any] = {}
+if sys.version_info >= (3, 10):
+    _DATACLASS_KWARGS["slots"] = True
+
+
+@dataclass(**_DATACLASS_KWARGS)
 class _BIDSEntitiesBase:
     """
     A dataclass representing known BIDS entities.
@@ -104,75 +132,51 @@ class _BIDSEntitiesBase:
         """
         Initialize from a dict of entities.
         """
-        filtered = {}
-        extra_entities: Dict[str, Union[str, int]] = {}
-        fields_map = {f.name: f for f in fields(cls) if f.name != "extra_entities"}
-
-        def add_to_extra(k: Any, v: Any):
-            if not isinstance(key, str):
-                raise TypeError(
-                    f"Extra entity {k} has type {type(k)}; only str supported"
-                )
-            if isinstance(v, (str, int)):
-                extra_entities[k] = v
-            else:
-                warnings.warn(
-                    f"Value {v} for extra entity {k} has type {type(v)}; "
-                    f"only str, int supported"
-                )
-
-        for key, val in entities.items():
-            if pd.isna(val):
-                continue
-
-            if key in fields_map:
-                fld = fields_map[key]
-                typ = _get_type(fld.type)
-                try:
-                    val = typ(val)
-                except ValueError as exc:
-                    raise ValueError(
-                        f"Unable to coerce {repr(val)} to type {typ} for "
-                        f"entity {fld.name}"
-                    ) from exc
-
-                allowed_values = fld.metadata.get("allowed_values")
-                if allowed_values and val not in allowed_values:
-                    raise ValueError(
-                        f"Value {val} for entity {fld.name} isn't one of the "
-                        f"allowed values {allowed_values}"
-                    )
-
-                filtered[key] = val
-
-            # Special handling if the dict already contains 'extra_entities'. This makes
-            # it easy to reconstruct entities from a df row.
-            elif key == "extra_entities":
-                assert isinstance(
-                    val, dict
-                ), "Value for 'extra_entities' key must be a dict"
-                for k, v in val.items():
-                    add_to_extra(k, v)
-
-            elif not valid_only:
-                add_to_extra(key, val)
-
-        return cls(**filtered, extra_entities=extra_entities)
+        # Dispatch to a constructor generated specifically for this class, with the
+        # per-entity coercion unrolled.
+        # Classes are hashable, but mypy checks the instance `__hash__` signature.
+        from_dict = _get_from_dict_impl(cls)  # type: ignore[arg-type]
+        return from_dict(cls, entities, valid_only)
 
     @classmethod
-    def from_path(cls, path: StrOrPath):
+    def from_path(cls, path: StrOrPath, entities: Optional[Dict[str, str]] = None):
         """
-        Initialize from a file path.
+        Initialize from a file path. Optionally pass the pre-parsed `entities` for the
+        path, as returned by `parse_bids_entities`.
         """
-        entities = parse_bids_entities(path)
-        return cls.from_dict(entities)
+        # Fused equivalent of `from_dict(parse_bids_entities(path))`. Parsed entities
+        # are always non-null strings, so we can skip the generic checks in `from_dict`
+        # and set the fields directly in one pass.
+        if entities is None:
+            entities = parse_bids_entities(path)
+        # Classes are hashable, but mypy checks the instance `__hash__` signature.
+        fields_map = _get_fields_map(cls)  # type: ignore[arg-type]
+
+        obj = cls.__new__(cls)
+        for name, fld in fields_map.items():
+            if name in entities:
+                val = _coerce_entity(fld, entities[name])
+            elif fld.default is not MISSING:
+                val = fld.default
+            else:
+                raise TypeError(f"Missing required entity '{name}' in path {path}")
+            object.__setattr__(obj, name, val)
+
+        extra_entities = {k: v for k, v in entities.items() if k not in fields_map}
+        object.__setattr__(obj, "extra_entities", extra_entities)
+        return obj
 
     def to_dict(self, valid_only: bool = False) -> Dict[str, Any]:
         """
         Convert entities to a plain dict.
         """
-        data = asdict(self)
-        extra = data.pop("extra_entities")
+        # Shallow copy is enough since all values are scalars, apart from
+        # extra_entities which is merged below. Much faster than asdict(). Instances
+        # have no __dict__ when slots are enabled, so look up fields by name.
+        # Classes are hashable, but mypy checks the instance `__hash__` signature.
+        fields_map = _get_fields_map(type(self))  # type: ignore[arg-type]
+        data = {name: getattr(self, name) for name in fields_map}
+        extra = self.extra_entities
         if not valid_only and extra:
             data.update(extra)
         return data
@@ -186,28 +190,42 @@ class _BIDSEntitiesBase:
         """
         Generate a filepath based on the entitities.
         """
-        special = {"datatype", "suffix", "ext"}
+        special = _PATH_SPECIAL_KEYS
         data = self.to_dict(valid_only=valid_only)
 
-        name = "_".join(
-            _fmt_ent(k, v, int_format=int_format)
-            for k, v in data.items()
-            if k not in special and not pd.isna(v)
+        # NA values are filtered on construction, so unset entities are always None.
+        # Check this first since most entities are unset.
+        ents = []
+        for k, v in data.items():
+            if v is None or k in special:
+                continue
+            if isinstance(v, int):
+                v = int_format % v
+            ents.append(f"{k}-{v}" if v else k)
+        name = "_".join(ents)
+        sub, ses, datatype, suffix, ext = (
+            self.sub,
+            self.ses,
+            self.datatype,
+            self.suffix,
+            self.ext,
         )
-        if self.suffix:
-            name += f"_{self.suffix}"
-        if self.ext:
-            name += self.ext
-
-        path = Path(name)
-        if self.datatype:
-            path = self.datatype / path
-        if self.ses:
-            path = f"ses-{self.ses}" / path
-        path = f"sub-{self.sub}" / path
+        if suffix:
+            name += f"_{suffix}"
+        if ext:
+            name += ext
+
+        # Build the path top-down as plain strings and construct a single Path at the
+        # end, rather than re-parsing the growing path at each level.
+        parts = [f"sub-{sub}"]
+        if ses:
+            parts.append(f"ses-{ses}")
+        if datatype:
+            parts.append(datatype)
+        parts.append(name)
         if prefix:
-            path = prefix / path
-        return path
+            return Path(os.fspath(prefix), *parts)
+        return Path(*parts)
 
     def with_update(
         self, entitities: Optional[Dict[str, Any]] = None, **kwargs
@@ -251,10 +269,146 @@ BIDSEntities: Any = make_dataclass(
         if f.name not in {f.name for f in fields(_BIDSEntitiesBase)}
     ],
     bases=(_BIDSEntitiesBase,),
+    **_DATACLASS_KWARGS,
 )
 del _sorted_entities
 
 
+class _EntityField(NamedTuple):
+    """
+    Resolved type info for an entity dataclass field.
+    """
+
+    name: str
+    type: type
+    allowed_values: Optional[FrozenSet[Any]]
+    default: Any
+
+
+@lru_cache()
+def _get_fields_map(cls: type) -> Dict[str, _EntityField]:
+    """
+    Get a map of entity field names to resolved field info, excluding
+    `extra_entities`. Cached per class so that the dataclass and typing reflection only
+    happens once.
+    """
+    fields_map = {}
+    for f in fields(cls):
+        if f.name == "extra_entities":
+            continue
+        # Frozen set for O(1) membership checks.
+        allowed_values = f.metadata.get("allowed_values")
+        if allowed_values is not None:
+            allowed_values = frozenset(allowed_values)
+        fields_map[f.name] = _EntityField(
+            name=f.name,
+            type=_get_type(f.type),
+            allowed_values=allowed_values,
+            default=f.default,
+        )
+    return fields_map
+
+
+@lru_cache()
+def _get_from_dict_impl(cls: type) -> Callable[..., Any]:
+    """
+    Generate a specialized implementation of `from_dict` for an entities class. The
+    set of entity fields is fixed per class, so we unroll the per-key coercion into
+    straight-line code, and only fall back to a generic loop for extra entities.
+    """
+    fields_map = _get_fields_map(cls)
+    namespace: Dict[str, Any] = {
+        "_MISSING": MISSING,
+        "_isna": pd.isna,
+        "_coerce": _coerce_entity,
+        "_add_extra": _add_extra_entity,
+    }
+
+    lines = [
+        "def from_dict(cls, given, valid_only):",
+        # Strings are never NA, so skip the more expensive check for the common case.
+        "    entities = {",
+        "        k: v for k, v in given.items() if type(v) is str or not _isna(v)",
+        "    }",
+    ]
+    for name, fld in fields_map.items():
+        namespace[f"_fld_{name}"] = fld
+        namespace[f"_default_{name}"] = fld.default
+        lines.append(f"    v = entities.pop({name!r}, _MISSING)")
+        if fld.type is str and not fld.allowed_values:
+            coerced = "str(v)"
+        else:
+            coerced = f"_coerce(_fld_{name}, v)"
+        if fld.default is MISSING:
+            lines += [
+                "    if v is _MISSING:",
+                "        raise TypeError(",
+                f"            f\"Missing required entity '{name}' in entities {{given}}\"",
+                "        )",
+                f"    {name} = {coerced}",
+            ]
+        else:
+            lines.append(
+                f"    {name} = _default_{name} if v is _MISSING else {coerced}"
+            )
+
+    # Special handling if the dict already contains 'extra_entities'. This makes it
+    # easy to reconstruct entities from a df row.
+    lines += [
+        "    extra = {}",
+        "    for k, v in entities.items():",
+        "        if k == 'extra_entities':",
+        "            assert isinstance(",
+        "                v, dict",
+        "            ), \"Value for 'extra_entities' key must be a dict\"",
+        "            for kk, vv in v.items():",
+        "                _add_extra(extra, kk, vv)",
+        "        elif not valid_only:",
+        "            _add_extra(extra, k, v)",
+    ]
+    args = ", ".join(f"{name}={name}" for name in fields_map)
+    lines.append(f"    return cls({args}, extra_entities=extra)")
+
+    exec("\n".join(lines), namespace)  # pylint: disable=exec-used
+    return namespace["from_dict"]
+
+
+def _add_extra_entity(extra_entities: Dict[str, Union[str, int]], k: Any, v: Any):
+    """
+    Add an extra entity, checking that its key and value have supported types.
+    """
+    if not isinstance(k, str):
+        raise TypeError(f"Extra entity {k} has type {type(k)}; only str supported")
+    if isinstance(v, (str, int)):
+        extra_entities[k] = v
+    else:
+        warnings.warn(
+            f"Value {v} for extra entity {k} has type {type(v)}; "
+            f"only str, int supported"
+        )
+
+
+def _coerce_entity(fld: _EntityField, val: Any) -> Any:
+    """
+    Coerce an entity value to the type of its field and check it's an allowed value.
+    """
+    typ = fld.type
+    try:
+        val = typ(val)
+    except ValueError as exc:
+        raise ValueError(
+            f"Unable to coerce {repr(val)} to type {typ} for entity {fld.name}"
+        ) from exc
+
+    allowed_values = fld.allowed_values
+    if allowed_values and val not in allowed_values:
+        raise ValueError(
+            f"Value {val} for entity {fld.name} isn't one of the "
+            f"allowed values {sorted(allowed_values)}"
+        )
+    return val
+
+
 def _get_type(alias: Any) -> type:
     """
     Unbox type aliases of the form `Optional[str]`.
@@ -275,19 +429,7 @@ def _is_optional(alias: Any) -> bool:
     )
 
 
-def _fmt_ent(
-    k: str,
-    v: Union[str, int],
-    *,
-    int_format: str = "%d",
-):
-    if isinstance(v, int):
-        v = int_format % v
-    ent = f"{k}-{v}" if len(v) > 0 else k
-    return ent
-
-
-@lru_cache()
+@lru_cache(maxsize=65536)
 def parse_bids_entities(path: StrOrPath) -> Dict[str, str]:
     """
     Parse all BIDS filename ``"{key}-{value}"`` entities as well as special entities:
@@ -300,26 +442,44 @@ def parse_bids_entities(path: StrOrPath) -> Dict[str, str]:
 
     .. note:: This function does not validate entities.
     """
-    path = Path(path)
-    entities = {}
+    # Work on the raw string to avoid the overhead of constructing a Path.
+    path = os.fspath(path)
+    if os.altsep:
+        path = path.replace(os.altsep, os.sep)
+    parent, _, filename = path.rpartition(os.sep)
+    datatype = _parse_bids_datatype(parent)
+
+    if _entities_disk_cache is None:
+        return _parse_bids_filename(filename, datatype)
+
+    key = (filename, datatype)
+    entities = _entities_disk_cache.get(key)
+    if entities is None:
+        entities = _parse_bids_filename(filename, datatype)
+        _entities_disk_cache[key] = entities
+    return entities
+
+
+@lru_cache(maxsize=8192)
+def _parse_bids_datatype(dirpath: str) -> Optional[str]:
+    """
+    Get the datatype for files in a directory, i.e. the closest parent directory named
+    for a BIDS datatype. Cached since many files share the same directory.
+    """
+    parts = dirpath.split(os.sep)
+    return next((part for part in reversed(parts) if part in BIDS_DATATYPES_SET), None)
 
-    # datatype
-    match = re.search(
-        f"/({'|'.join(BIDS_DATATYPES)})/",
-        path.as_posix(),
-    )
-    datatype = match.group(1) if match is not None else None
 
-    filename = path.name
-    parts = filename.split("_")
+def _parse_bids_filename(filename: str, datatype: Optional[str]) -> Dict[str, str]:
+    """
+    Parse BIDS entities from a file name, given the datatype parsed from the full path.
+    """
+    # NOTE: plain str partition/split is faster than regex for these short names.
 
     # suffix and extension
-    suffix_ext = parts.pop()
-    idx = suffix_ext.find(".")
-    if idx < 0:
-        suffix, ext = suffix_ext, None
-    else:
-        suffix, ext = suffix_ext[:idx], suffix_ext[idx:]
+    head, sep, suffix_ext = filename.rpartition("_")
+    suffix, dot, ext = suffix_ext.partition(".")
+    parts = head.split("_") if sep else []
 
     # suffix is actually an entity, put back in list
     if "-" in suffix:
@@ -327,16 +487,138 @@ def parse_bids_entities(path: StrOrPath) -> Dict[str, str]:
         suffix = None
 
     # parse entities
+    entities = {}
     for part in parts:
-        if "-" in part:
-            key, val = part.split("-", maxsplit=1)
-        else:
-            key, val = part, ""
+        key, _, val = part.partition("-")
         entities[key] = val
 
+    if datatype is not None:
+        entities["datatype"] = datatype
+    if suffix is not None:
+        entities["suffix"] = suffix
+    if dot:
+        entities["ext"] = dot + ext
+    return entities
+
+
+_EntitiesCacheKey = Tuple[str, Optional[str]]
+
+_entities_disk_cache: Optional[Dict[_EntitiesCacheKey, Dict[str, str]]] = None
+
+DEFAULT_ENTITIES_CACHE_PATH = Path("~/.cache/bids2table/entities.pkl")
+
+
+def _entities_cache_version() -> str:
+    """
+    Version tag for the persisted entities cache. Changes whenever the BIDS schema
+    datatypes change.
+    """
+    return hashlib.sha1("|".join(BIDS_DATATYPES).encode()).hexdigest()
+
+
+def load_entities_cache(path: Optional[StrOrPath] = None) -> int:
+    """
+    Load the persistent entities cache from ``path`` (default
+    ``~/.cache/bids2table/entities.pkl``) and enable it for `parse_bids_entities`.
+    Parsed entities are keyed by file name and datatype, so they can be reused across
+    runs. A missing, corrupt, or stale cache is replaced by an empty one. Returns the
+    number of cached entries.
+    """
+    global _entities_disk_cache
+
+    path = Path(path or DEFAULT_ENTITIES_CACHE_PATH).expanduser()
+    entries: Dict[_EntitiesCacheKey, Dict[str, str]] = {}
+    if path.exists():
+        try:
+            with path.open("rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == _entities_cache_version():
+                entries = data["entries"]
+        except Exception as exc:  # pylint: disable=broad-except
+            warnings.warn(f"Failed to load entities cache {path}: {exc}")
+
+    _entities_disk_cache = entries
+    parse_bids_entities.cache_clear()
+    return len(entries)
+
+
+def save_entities_cache(path: Optional[StrOrPath] = None) -> None:
+    """
+    Save the entities cache enabled by `load_entities_cache` to ``path`` (default
+    ``~/.cache/bids2table/entities.pkl``). Does nothing if the cache is not enabled.
+    """
+    if _entities_disk_cache is None:
+        return
+
+    path = Path(path or DEFAULT_ENTITIES_CACHE_PATH).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"version": _entities_cache_version(), "entries": _entities_disk_cache}
+    # Write to a temp file and rename so concurrent readers never see a partial file.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def parse_bids_entities_batch(paths: pd.Series) -> pd.DataFrame:
+    """
+    Parse BIDS entities for a batch of file paths using vectorized pandas string
+    operations. Returns a table with one row per path and one column per entity key,
+    with missing entities set to NA. Each row is equivalent to the output of
+    `parse_bids_entities` for the corresponding path.
+
+    .. note:: This function does not validate entities.
+    """
+    paths = pd.Series(paths, dtype=object)
+    index = paths.index
+    if len(paths) == 0:
+        return pd.DataFrame(index=index)
+
+    paths = paths.astype(str).reset_index(drop=True)
+    if os.sep != "/":
+        paths = paths.str.replace(os.sep, "/", regex=False)
+
+    # datatype
+    datatype = paths.str.extract(_DATATYPE_PATTERN, expand=False)
+
+    filenames = paths.str.rsplit("/", n=1).str[-1]
+    head_tail = filenames.str.rpartition("_")
+    head = head_tail[0]
+    has_sep = head_tail[1] == "_"
+
+    # suffix and extension
+    suffix_ext = head_tail[2].str.partition(".")
+    suffix = suffix_ext[0]
+    ext = ("." + suffix_ext[2]).where(suffix_ext[1] == ".")
+
+    # suffix is actually an entity, put back in list
+    is_entity = suffix.str.contains("-", regex=False)
+    head = head.where(~is_entity, (head + "_" + suffix).where(has_sep, suffix))
+    suffix = suffix.where(~is_entity)
+
+    # parse entities, one row per (path, entity) pair
+    tokens = head[has_sep | is_entity].str.split("_").explode()
+    if len(tokens) > 0:
+        key_val = tokens.str.partition("-")
+        pairs = pd.DataFrame(
+            {
+                "row": tokens.index,
+                "key": key_val[0].to_numpy(),
+                "val": key_val[2].to_numpy(),
+            }
+        )
+        pairs = pairs.drop_duplicates(["row", "key"], keep="last")
+        entities = pairs.pivot(index="row", columns="key", values="val")
+        entities = entities.reindex(index=paths.index, columns=pd.unique(pairs["key"]))
+        entities.columns.name = None
+    else:
+        entities = pd.DataFrame(index=paths.index)
+
     for k, v in zip(["datatype", "suffix", "ext"], [datatype, suffix, ext]):
-        if v is not None:
+        if v.notna().any():
             entities[k] = v
+
+    entities.index = index
     return entities
 
 
@@ -1,40 +1,124 @@
+"""
+[Elbow](https://github.com/childmindresearch/elbow) extract functions for BIDS datasets.
+"""
 import logging
-from pathlib import Path
-from typing import Generator, List, Optional
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from fnmatch import fnmatch
+from itertools import repeat
+from typing import Deque, Dict, Generator, Iterable, List, Optional, Tuple, Union
 
 from elbow.extractors import extract_file_meta
 from elbow.record import Record, concat
-from elbow.sources.filesystem import Crawler
 from elbow.typing import StrOrPath
 
-from bids2table.entities import BIDSEntities
+from bids2table.entities import BIDSEntities, parse_bids_entities
 
 from .dataset import extract_dataset
 from .metadata import extract_metadata, is_associated_sidecar
 
 logger = logging.getLogger(__name__)
 
+# Shared placeholder metadata record when metadata extraction is disabled.
+_EMPTY_META = Record({"json": None}, types={"json": "json"})
+
 
 def extract_bids_file(path: StrOrPath, with_meta: bool = True) -> Optional[Record]:
     """
     Extract BIDS entities and metadata from a data file in a BIDS dataset.
     """
+    path = os.fspath(path)
     if not is_bids_file(path):
         return None
 
+    parsed = _parse_entities(path)
+    if parsed is None:
+        return None
+    entities, parsed_dict = parsed
+
+    if with_meta:
+        meta_rec = extract_metadata(path, entities=parsed_dict)
+    else:
+        meta_rec = _EMPTY_META
+    return _make_record(path, entities, meta_rec)
+
+
+def _extract_bids_files(
+    paths: List[str], with_meta: bool = True, workers: int = 1
+) -> List[Record]:
+    """
+    Extract BIDS records for a batch of paths already checked with `is_bids_file`.
+    Entities are parsed per file, sharing the `parse_bids_entities` cache. See
+    `_make_records` for `workers`.
+    """
+    valid: List[Tuple[str, BIDSEntities, Dict[str, str]]] = []
+    for path in paths:
+        parsed = _parse_entities(path)
+        if parsed is not None:
+            valid.append((path, *parsed))
+    return _make_records(valid, with_meta=with_meta, workers=workers)
+
+
+def _parse_entities(path: str) -> Optional[Tuple[BIDSEntities, Dict[str, str]]]:
+    """
+    Parse the entities for a file once, returning both the structured entities and
+    the raw parsed dict to share with the other extractors. Returns `None` and logs a
+    warning if the entities are incomplete or invalid.
+    """
+    parsed = parse_bids_entities(path)
     try:
-        entities = BIDSEntities.from_path(path)
+        entities = BIDSEntities.from_path(path, entities=parsed)
     except (TypeError, ValueError) as exc:
         logger.warning(
             "Incomplete and/or invalid entities in file %s", path, exc_info=exc
         )
         return None
+    return entities, parsed
 
-    dset_rec = extract_dataset(path)
-    if with_meta:
-        meta_rec = extract_metadata(path)
+
+def _make_records(
+    valid: List[Tuple[str, BIDSEntities, Dict[str, str]]],
+    with_meta: bool = True,
+    workers: int = 1,
+) -> List[Record]:
+    """
+    Assemble records for files with pre-parsed entities, loading their metadata. If
+    `workers` > 1, the sidecar metadata is loaded in a thread pool of that size.
+    Otherwise it is loaded inline, e.g. when the caller already runs in a worker.
+    """
+    if not valid:
+        return []
+
+    meta_recs: Iterable[Record]
+    if not with_meta:
+        meta_recs = repeat(_EMPTY_META)
+    elif workers > 1:
+        # The JSON reads release the GIL, so they overlap with each other and with
+        # extracting the rest of each record.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(extract_metadata, path, entities=parsed)
+                for path, _, parsed in valid
+            ]
+            meta_recs = [future.result() for future in futures]
     else:
-        meta_rec = Record({"json": None}, types={"json": "json"})
+        meta_recs = (
+            extract_metadata(path, entities=parsed) for path, _, parsed in valid
+        )
+
+    records = [
+        _make_record(path, entities, meta_rec)
+        for (path, entities, _), meta_rec in zip(valid, meta_recs)
+    ]
+    return records
+
+
+def _make_record(path: StrOrPath, entities: BIDSEntities, meta_rec: Record) -> Record:
+    """
+    Assemble the full BIDS record for a file with pre-parsed entities and metadata.
+    """
+    dset_rec = extract_dataset(path)
     file_rec = extract_file_meta(path)
 
     rec = concat({"ds": dset_rec, "ent": entities, "meta": meta_rec, "finfo": file_rec})
@@ -42,25 +126,148 @@ def extract_bids_file(path: StrOrPath, with_meta: bool = True) -> Optional[Recor
 
 
 def extract_bids_subdir(
-    path: StrOrPath, exclude: List[str], with_meta: bool = True
+    path: StrOrPath, exclude: List[str], with_meta: bool = True, workers: int = 1
 ) -> Generator[Optional[Record], None, None]:
     """
-    Extract BIDS records recursively for all files in a sub-directory.
+    Extract BIDS records recursively for all files in a sub-directory. If `workers` >
+    1, the JSON sidecar metadata for the files is loaded concurrently in a thread pool
+    of that size. Reading the sidecars dominates the extraction and releases the GIL.
     """
-    for path in Crawler(root=path, skip=exclude, exclude=exclude, follow_links=True):
-        yield extract_bids_file(path, with_meta=with_meta)
+    # Entries from the scan are never directories.
+    paths = [
+        entry.path
+        for entry in _scan_files(path, exclude)
+        if is_bids_file(entry, is_dir=False)
+    ]
+    yield from _extract_bids_files(paths, with_meta=with_meta, workers=workers)
 
 
-def is_bids_file(path: StrOrPath) -> bool:
+def _scan_files(
+    root: StrOrPath, exclude: List[str]
+) -> Generator[os.DirEntry, None, None]:
+    """
+    Walk the directory tree under `root` with `os.scandir`, yielding entries for all
+    non-directory files. Symlinks are followed. Files and directories matching any of
+    the `exclude` names or glob patterns are skipped.
+    """
+    exclude_names = frozenset(pat for pat in exclude if not _is_pattern(pat))
+    exclude_patterns = [pat for pat in exclude if _is_pattern(pat)]
+
+    stack: Deque[str] = deque([os.fspath(root)])
+    while stack:
+        dirpath = stack.pop()
+        try:
+            it = os.scandir(dirpath)
+        except OSError as exc:
+            logger.warning("Failed to scan directory %s", dirpath, exc_info=exc)
+            continue
+
+        with it:
+            for entry in it:
+                name = entry.name
+                if name in exclude_names or any(
+                    fnmatch(name, pat) for pat in exclude_patterns
+                ):
+                    continue
+                # DirEntry caches the file type from the directory listing, so this
+                # usually doesn't need an extra stat.
+                if entry.is_dir():
+                    stack.append(entry.path)
+                else:
+                    yield entry
+
+
+def _is_pattern(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def extract_bids_subdir_parallel(
+    path: StrOrPath,
+    exclude: List[str],
+    with_meta: bool = True,
+    workers: Optional[int] = None,
+    use_threads: bool = False,
+) -> Generator[Optional[Record], None, None]:
+    """
+    Extract BIDS records recursively for all files in a directory, in parallel over its
+    immediate sub-directories (e.g. the subject directories of a dataset). Each
+    sub-directory is extracted with `extract_bids_subdir` and records are yielded in
+    the same order as the sequential extraction.
+
+    If `workers` is `None` or 1, run sequentially in the current process. Setting to <=
+    0 uses as many workers as there are cores available. Set `use_threads` to run in a
+    thread pool rather than a process pool, which is preferable when reading large JSON
+    sidecars dominates.
+    """
+    if workers is None or workers == 1:
+        yield from extract_bids_subdir(path, exclude=exclude, with_meta=with_meta)
+        return
+    if workers <= 0:
+        workers = os.cpu_count()
+
+    subdirs = []
+    files = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if any(fnmatch(entry.name, pattern) for pattern in exclude):
+                continue
+            if entry.is_dir():
+                subdirs.append(entry.path)
+            elif is_bids_file(entry, is_dir=False):
+                files.append(entry.path)
+
+    yield from _extract_bids_files(files, with_meta=with_meta)
+
+    # Bound the number of in-flight tasks so that memory stays flat for datasets with
+    # many sub-directories. Results are consumed in submission order so the output is
+    # deterministic. Sub-directories are submitted in reverse to match the depth-first
+    # order of `_scan_files`.
+    max_pending = 4 * workers
+    executor_cls = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for subdir in reversed(subdirs):
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+            pending.append(
+                executor.submit(_extract_bids_subdir_list, subdir, exclude, with_meta)
+            )
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _extract_bids_subdir_list(
+    path: str, exclude: List[str], with_meta: bool = True
+) -> List[Optional[Record]]:
+    """
+    Materialized `extract_bids_subdir` that can be run in a worker process.
+    """
+    return list(extract_bids_subdir(path, exclude=exclude, with_meta=with_meta))
+
+
+def is_bids_file(
+    path: Union[StrOrPath, os.DirEntry], *, is_dir: Optional[bool] = None
+) -> bool:
     """
     Check if `path` is a valid BIDS data file. E.g. not a directory or JSON sidecar
-    associated to another data file.
+    associated to another data file. If the caller already knows whether `path` is a
+    directory, pass it as `is_dir` to skip the file type check. If `path` is an
+    `os.DirEntry`, its cached file type is used.
     """
     # TODO: other checks?
     #   - skip files matching patterns in .bidsignore?
-    path = Path(path)
-    return (
-        not path.is_dir()
-        and path.name.startswith("sub-")
-        and not is_associated_sidecar(path)
-    )
+    if isinstance(path, os.DirEntry):
+        name = path.name
+        if is_dir is None and name.startswith("sub-"):
+            is_dir = path.is_dir()
+        path = path.path
+    else:
+        path = os.fspath(path)
+        name = os.path.basename(path)
+
+    if not name.startswith("sub-"):
+        return False
+    if is_dir is None:
+        is_dir = os.path.isdir(path)
+    return not is_dir and not is_associated_sidecar(path)
@@ -1,12 +1,16 @@
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from elbow.record import Record
 from elbow.typing import StrOrPath
 
+from .utils import load_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +42,18 @@ def identify_bids_dataset(path: StrOrPath) -> Tuple[Optional[str], Optional[Path
     """
     path = Path(path)
     parent = path if path.is_dir() else path.parent
+    dataset, root = _identify_bids_dataset_dir(parent)
+    if dataset is None:
+        logger.warning("File %s is not part of any valid BIDS dataset.", path)
+    return dataset, root
+
 
+@lru_cache(maxsize=4096)
+def _identify_bids_dataset_dir(parent: Path) -> Tuple[Optional[str], Optional[Path]]:
+    """
+    Identify the BIDS dataset containing the directory ``parent``. Cached since all
+    files in a directory share the same dataset.
+    """
     parts: List[str] = []
     scanning = False
     top_idx = None
@@ -57,7 +72,6 @@ def identify_bids_dataset(path: StrOrPath) -> Tuple[Optional[str], Optional[Path
         parent = parent.parent
 
     if len(parts) == 0:
-        logger.warning("File %s is not part of any valid BIDS dataset.", path)
         return None, None
 
     parts = parts[: top_idx + 1]
@@ -65,26 +79,56 @@ def identify_bids_dataset(path: StrOrPath) -> Tuple[Optional[str], Optional[Path
     return dataset, root
 
 
-@lru_cache(maxsize=512)
+@lru_cache(maxsize=4096)
 def is_dataset_root(path: Path) -> bool:
     """
     Test if ``path`` is a BIDS dataset root directory.
     """
-    return path.is_dir() and (path / "dataset_description.json").exists()
+    # A single stat, since the description existing implies path is a directory.
+    return os.path.exists(os.path.join(path, "dataset_description.json"))
+
+
+def prefetch_dataset_descriptions(
+    roots: Iterable[Path], workers: Optional[int] = None
+) -> None:
+    """
+    Load the JSON descriptions for multiple dataset ``roots`` concurrently in a thread
+    pool, populating the cache used by `get_dataset_description`. Paths which are not
+    dataset roots are ignored. This overlaps the read latency when many datasets will
+    be visited, e.g. on network filesystems.
+    """
+    roots = [root for root in roots if is_dataset_root(root)]
+    if len(roots) <= 1:
+        for root in roots:
+            get_dataset_description(root)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Consume the iterator to surface any exceptions.
+        list(executor.map(get_dataset_description, roots))
+
+
+# Cache of dataset root -> (description mtime, description).
+_description_cache: Dict[Path, Tuple[int, Optional[Dict[str, Any]]]] = {}
 
 
-@lru_cache(maxsize=64)
 def get_dataset_description(root: Path) -> Optional[Dict[str, Any]]:
     """
-    Load the JSON description for the BIDS dataset root directory ``root``.
+    Load the JSON description for the BIDS dataset root directory ``root``. Results
+    are cached, and reloaded if the description file is modified.
     """
     if not is_dataset_root(root):
         raise ValueError(f"{root} is not a BIDS dataset root")
 
     desc_path = root / "dataset_description.json"
-    with desc_path.open() as f:
-        try:
-            description = json.load(f)
-        except json.JSONDecodeError:
-            description = None
+    mtime = desc_path.stat().st_mtime_ns
+    cached = _description_cache.get(root)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        description = load_json(desc_path)
+    except json.JSONDecodeError:
+        description = None
+    _description_cache[root] = (mtime, description)
     return description
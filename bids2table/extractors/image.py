@@ -1,11 +1,13 @@
+import gzip
 import logging
-from typing import Any, Dict, Tuple
+from typing import IO, Any, Dict, Optional, Tuple, Type, Union
 
 import nibabel as nib
 import numpy as np
 from elbow.record import Record
 from elbow.typing import StrOrPath
 from nibabel.filebasedimages import ImageFileError
+from nibabel.spatialimages import HeaderDataError
 
 from bids2table.entities import parse_bids_entities
 
@@ -19,18 +21,32 @@ except ModuleNotFoundError:
 logger = logging.getLogger(__name__)
 
 # TODO: add more
-IMAGE_EXTENSIONS = {".nii", ".nii.gz"}
+IMAGE_EXTENSIONS = frozenset({".nii", ".nii.gz"})
 
+# Legacy Analyze 7.5 header fields which are unused in NIfTI-1 and always zero.
+_UNUSED_HEADER_FIELDS = frozenset(
+    {"data_type", "db_name", "extents", "session_error", "regular", "glmax", "glmin"}
+)
 
-def extract_image_meta(path: StrOrPath, *, backend: str = "nibabel") -> Record:
-    entities = parse_bids_entities(path)
+_NIFTI1_HEADER_SIZE = 348
+_NIFTI2_HEADER_SIZE = 540
+
+
+def extract_image_meta(
+    path: StrOrPath,
+    *,
+    backend: str = "nibabel",
+    entities: Optional[Dict[str, str]] = None,
+) -> Record:
+    if entities is None:
+        entities = parse_bids_entities(path)
     ext = entities.get("ext")
 
     header = affine = None
     if ext in IMAGE_EXTENSIONS:
         try:
             header, affine = _read_image_meta(str(path), backend=backend)
-        except (ImageFileError, SystemError) as exc:
+        except (ImageFileError, HeaderDataError, SystemError) as exc:
             logger.warning("Failed to load image %s", path, exc_info=exc)
 
     rec = Record(
@@ -54,21 +70,70 @@ def _read_image_meta(
         header = nifti.read_header(path)
         # TODO: affine not currently implemented for nifti lib
         affine = None
+        header = {k: _cast_header_value(v) for k, v in header.items()}
     else:
-        img = nib.load(path)
-        if not isinstance(img, nib.Nifti1Image):
-            raise TypeError(
-                f"Foung image type {type(img).__name__}; only Nifti1Image supported"
-            )
-
-        header = {k: v for k, v in img.header.items()}
-        affine = np.asarray(img.affine)
-
-    header = {k: _cast_header_value(v) for k, v in header.items()}
+        nii_header = _read_nifti_header(path)
+        header = _header_to_dict(nii_header)
+        affine = np.asarray(nii_header.get_best_affine())
     return header, affine
 
 
-def _cast_header_value(value: np.ndarray) -> Any:
+def _read_nifti_header(path: str) -> nib.Nifti1Header:
+    """
+    Read just the header of a NIfTI-1 or NIfTI-2 image, without setting up the image
+    data proxy. Header values match those of the image loaded with `nib.load`.
+    """
+    f: Union[gzip.GzipFile, IO[bytes]]
+    if path.endswith(".gz"):
+        f = gzip.open(path, "rb")
+    else:
+        f = open(path, "rb")
+    with f:
+        binary = f.read(_NIFTI2_HEADER_SIZE)
+        if len(binary) < _NIFTI1_HEADER_SIZE:
+            raise HeaderDataError(f"Truncated NIfTI header in {path}")
+
+        # NIfTI-2 headers have their magic string near the start, rather than at the
+        # end.
+        header_cls: Type[nib.Nifti1Header]
+        if binary[4:8] == b"n+2\x00":
+            header_cls = nib.Nifti2Header
+        else:
+            header_cls = nib.Nifti1Header
+
+        # Parse from the file itself, since header extensions can extend past the
+        # bytes read above.
+        f.seek(0)
+        header = header_cls.from_fileobj(f)
+
+    # Loaded images move the data scaling into the array proxy and reset the offset.
+    header.set_slope_inter(None, None)
+    header["vox_offset"] = 0
+    return header
+
+
+def _header_to_dict(header: nib.Nifti1Header) -> Dict[str, Any]:
+    """
+    Convert a NiBabel header to a dict of header values, skipping unused legacy fields.
+    NIfTI headers wrap a single numpy structured array, which we convert to python in
+    one ``tolist()`` call.
+    """
+    structarr = header.structarr
+    header_dict = {}
+    for k, v in zip(structarr.dtype.names, structarr.tolist()):
+        if k in _UNUSED_HEADER_FIELDS:
+            continue
+        # Numeric scalars, the common case, are already python values. Only sub-array
+        # fields remain numpy arrays, and string fields are bytes.
+        if type(v) is np.ndarray:
+            v = v.tolist()
+        elif type(v) is bytes:
+            v = v.decode()
+        header_dict[k] = v
+    return header_dict
+
+
+def _cast_header_value(value: Any) -> Any:
     """
     NiBabel header values appear to be numpy arrays whose data can be:
 
@@ -80,7 +145,8 @@ def _cast_header_value(value: np.ndarray) -> Any:
 
     TODO: Check these assumptions against more nibabel image types.
     """
-    cast_value = value.tolist()
-    if isinstance(cast_value, bytes):
-        cast_value = cast_value.decode()
-    return cast_value
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = value.tolist()
+    if isinstance(value, bytes):
+        value = value.decode()
+    return value
@@ -1,13 +1,12 @@
+import itertools
+import os
 from functools import lru_cache
-from pathlib import Path
-from typing import Dict, Generator, List, Optional
+from typing import Dict, FrozenSet, Generator, Optional, Tuple
 
 from elbow.typing import StrOrPath
 
 from bids2table.entities import parse_bids_entities
 
-from .dataset import is_dataset_root
-
 
 def find_bids_parents(
     query: Dict[str, str],
@@ -28,28 +27,38 @@ def find_bids_parents(
     ext = query.get("ext")
     if not (suffix or ext):
         raise ValueError("At least one of 'suffix' or 'ext' are required in `query`.")
-    pattern = f"*{suffix}{ext}" if suffix else f"*{ext}"
-
-    start = Path(start).absolute()
-    if not start.is_dir():
-        start = start.parent
-
-    if depth is None:
-        depth = len(start.parts)
-
-    for _ in range(depth):
-        for path in _glob(start, pattern):
-            entities = parse_bids_entities(path)
-            if _test_bids_match(query, entities):
-                yield str(path)
+    # Equivalent to globbing for f"*{tail}", but with plain string matching.
+    tail = f"{suffix}{ext}" if suffix else f"{ext}"
+
+    # Freeze the query once so that each candidate can be matched with a single subset
+    # check.
+    query_items = frozenset(query.items())
+
+    # Climb with plain strings rather than Path objects, which are slow to construct.
+    dirpath = os.path.abspath(start)
+    if not os.path.isdir(dirpath):
+        dirpath = os.path.dirname(dirpath)
+
+    levels = range(depth) if depth is not None else itertools.count()
+    for _ in levels:
+        for path, entities in _list_candidates(dirpath, tail):
+            # Inheritance principle: all of the candidate's entities (apart from
+            # datatype) must be present in the query with the same values.
+            if entities <= query_items:
+                yield path
 
         # Stop climbing the directory if we find the description json, which should
-        # always be at the top-level dataset directory.
+        # always be at the top-level dataset directory. The cached directory listing
+        # saves another stat.
         # TODO: for nested datasets, can you inherit beyond the first root? I hope not..
-        if is_dataset_root(start):
+        if "dataset_description.json" in _list_dir(dirpath):
             break
 
-        start = start.parent
+        # Stop at the filesystem root.
+        parent = os.path.dirname(dirpath)
+        if parent == dirpath:
+            break
+        dirpath = parent
 
 
 def find_first_bids_parent(
@@ -62,17 +71,33 @@ def find_first_bids_parent(
     return next(find_bids_parents(query, start, depth), None)
 
 
-@lru_cache()
-def _glob(path: Path, pattern: str) -> List[Path]:
-    return list(path.glob(pattern))
+@lru_cache(maxsize=4096)
+def _list_dir(path: str) -> Tuple[str, ...]:
+    """
+    List the entry names in a directory. Cached so that each directory is only read
+    once, no matter how many files search it for sidecars.
+    """
+    try:
+        with os.scandir(path) as it:
+            return tuple(entry.name for entry in it)
+    except OSError:
+        return ()
 
 
-def _test_bids_match(query: Dict[str, str], entities: Dict[str, str]) -> bool:
+@lru_cache(maxsize=4096)
+def _list_candidates(
+    dirpath: str, tail: str
+) -> Tuple[Tuple[str, FrozenSet[Tuple[str, str]]], ...]:
     """
-    Test if entities satisfies the inheritance principle for query.
+    Find the candidate parent files in ``dirpath`` ending with ``tail``, together with
+    their parsed entities as a set of ``(key, value)`` pairs, excluding datatype. Cached
+    since sibling files all search the same ancestor directories.
     """
-    entities = entities.copy()
-    entities.pop("datatype", None)
-    return set(entities).issubset(query) and all(
-        query[k] == v for k, v in entities.items()
-    )
+    candidates = []
+    for name in _list_dir(dirpath):
+        if name.endswith(tail):
+            path = os.path.join(dirpath, name)
+            entities = parse_bids_entities(path)
+            items = frozenset((k, v) for k, v in entities.items() if k != "datatype")
+            candidates.append((path, items))
+    return tuple(candidates)
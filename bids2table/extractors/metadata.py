@@ -1,36 +1,55 @@
 import json
 import logging
+import os
 import traceback
-from pathlib import Path
+from collections import ChainMap
+from functools import lru_cache
+from typing import Dict, Optional
 
 from elbow.record import Record
 from elbow.typing import StrOrPath
 
 from bids2table.entities import parse_bids_entities
 
-from .inheritance import _glob, find_bids_parents
+from .inheritance import _list_dir, find_bids_parents
+from .utils import loads_json, read_bytes
 
 logger = logging.getLogger(__name__)
 
 
-def extract_metadata(path: StrOrPath) -> Record:
+def extract_metadata(
+    path: StrOrPath, entities: Optional[Dict[str, str]] = None
+) -> Record:
     """
     Load the JSON sidecar metadata associated with ``path``. Supports metadata
-    inheritance by searching up the directory tree for matching JSON files.
+    inheritance by searching up the directory tree for matching JSON files. Optionally
+    pass the pre-parsed ``entities`` for ``path``, as returned by
+    `parse_bids_entities`.
     """
-    entities = parse_bids_entities(path)
+    if entities is None:
+        entities = parse_bids_entities(path)
     query = dict(entities, ext=".json")
 
-    metadata = {}
-    sidecars = reversed(list(find_bids_parents(query, start=Path(path).parent)))
-    for path in sidecars:
-        with open(path) as f:
-            try:
-                metadata.update(json.load(f))
-            except (json.JSONDecodeError, TypeError):
-                logger.warning(
-                    f"Bad JSON sidecar data {path}\n\n" + traceback.format_exc()
-                )
+    # Sidecars are found closest first.
+    sidecars = list(find_bids_parents(query, start=os.path.dirname(path)))
+
+    contents = [read_bytes(sidecar) for sidecar in sidecars]
+
+    layers = []
+    for path, data in zip(sidecars, contents):
+        try:
+            layer = loads_json(data)
+            if not isinstance(layer, dict):
+                raise TypeError(f"Expected a JSON object; got {type(layer).__name__}")
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"Bad JSON sidecar data {path}\n\n" + traceback.format_exc())
+            continue
+        layers.append(layer)
+
+    # Chaining the layers closest first gives the same result as updating from the top
+    # down, without reversing: closer sidecars take precedence and keys are ordered
+    # top-level first.
+    metadata = dict(ChainMap(*layers))
 
     # TODO: type aliases for json, pickle, etc so we can use a dataclass here.
     rec = Record({"json": metadata or None}, types={"json": "json"})
@@ -41,10 +60,10 @@ def is_associated_sidecar(path: StrOrPath) -> bool:
     """
     Check if a file is a JSON sidecar associated with other data file(s).
     """
-    path = Path(path)
+    path = os.fspath(path)
 
     # Must be JSON
-    if not path.suffix == ".json":
+    if not path.endswith(".json"):
         return False
 
     entities = parse_bids_entities(path)
@@ -60,9 +79,30 @@ def is_associated_sidecar(path: StrOrPath) -> bool:
 
     # Finally, check if there are any matches at the lowest level
     # If not, we are a key-value file or solo sidecar like an MRIQC IQM JSON.
-    # Note this pattern always matches the file itself, so we check if there are any
-    # extra matches.
-    if len(_glob(path.parent, f"*_{suffix}.*")) > 1:
+    # Note the file itself always matches, so we check if there are any extra matches.
+    if _count_suffix_matches(os.path.dirname(path)).get(suffix, 0) > 1:
         return True
 
     return False
+
+
+@lru_cache(maxsize=4096)
+def _count_suffix_matches(dirpath: str) -> Dict[str, int]:
+    """
+    Count the entries in a directory matching the glob pattern ``"*_{suffix}.*"`` for
+    every possible ``suffix``. I.e. for each ``suffix`` such that ``"_{suffix}."``
+    appears in the entry name. Cached so that sidecar checks are a dict lookup.
+    """
+    counts: Dict[str, int] = {}
+    for name in _list_dir(dirpath):
+        suffixes = set()
+        start = name.find("_")
+        while start >= 0:
+            end = name.find(".", start + 1)
+            while end >= 0:
+                suffixes.add(name[start + 1 : end])
+                end = name.find(".", end + 1)
+            start = name.find("_", start + 1)
+        for suffix in suffixes:
+            counts[suffix] = counts.get(suffix, 0) + 1
+    return counts
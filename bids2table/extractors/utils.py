@@ -0,0 +1,52 @@
+import json
+from typing import Any
+
+from elbow.typing import StrOrPath
+
+try:
+    import orjson
+
+    has_orjson = True
+except ModuleNotFoundError:
+    has_orjson = False
+
+try:
+    import ujson  # type: ignore[import]
+
+    has_ujson = True
+except ModuleNotFoundError:
+    has_ujson = False
+
+
+def load_json(path: StrOrPath) -> Any:
+    """
+    Load a JSON file, using the faster `orjson` or `ujson` parsers if installed. Inputs
+    these reject but the standard `json` module accepts, e.g. `NaN` or very large
+    integers, fall back to `json`. Raises a `json.JSONDecodeError` for invalid JSON.
+    """
+    return loads_json(read_bytes(path))
+
+
+def read_bytes(path: StrOrPath) -> bytes:
+    """
+    Read the full contents of a file.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def loads_json(data: bytes) -> Any:
+    """
+    Parse JSON bytes. See `load_json` for details.
+    """
+    if has_orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    elif has_ujson:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
@@ -1,7 +1,8 @@
 import logging
 import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Union
+from typing import DefaultDict, Optional, Tuple, Union
 
 
 class RepetitiveFilter(logging.Filter):
@@ -9,18 +10,25 @@ class RepetitiveFilter(logging.Filter):
     Suppress similar log messages after a number of repeats.
     """
 
+    SUPPRESSED_SUFFIX = " [future messages suppressed]"
+
     def __init__(self, max_repeats: int = 5):
         self.max_repeats = max_repeats
 
-        self._counts: Dict[Tuple[str, int], int] = {}
+        self._counts: DefaultDict[Tuple[str, int], int] = defaultdict(int)
 
     def filter(self, record: logging.LogRecord):
         key = record.pathname, record.lineno
-        count = self._counts.get(key, 0)
+        count = self._counts[key]
+        if count < self.max_repeats:
+            self._counts[key] = count + 1
+            return True
+        # Mark the last message shown. After that, the count no longer needs updating.
         if count == self.max_repeats:
-            record.msg += " [future messages suppressed]"
-        self._counts[key] = count + 1
-        return count <= self.max_repeats
+            self._counts[key] = count + 1
+            record.msg = f"{record.msg}{self.SUPPRESSED_SUFFIX}"
+            return True
+        return False
 
 
 def setup_logging(
@@ -1,13 +1,64 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from functools import cached_property
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Union
-
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 import pandas as pd
 
-from bids2table.entities import ENTITY_NAMES_TO_KEYS, BIDSEntities
+from bids2table.entities import (
+    _DATACLASS_KWARGS,
+    ENTITY_NAMES_TO_KEYS,
+    BIDSEntities,
+    _EntityField,
+    _get_fields_map,
+)
 from bids2table.extractors.metadata import extract_metadata
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    has_pyarrow = True
+except ModuleNotFoundError:
+    has_pyarrow = False
+
+# Table columns for the sort keys accepted by `sort_entities`, other than short entity
+# keys which are simply prefixed.
+_SORT_COLUMNS = {name: f"ent__{key}" for name, key in ENTITY_NAMES_TO_KEYS.items()}
+_SORT_COLUMNS["dataset"] = "ds__dataset"
+
+# String columns with few distinct values, which can be stored as categoricals.
+_CATEGORICAL_COLUMNS = (
+    "ds__dataset",
+    "ent__datatype",
+    "ent__sub",
+    "ent__ses",
+    "ent__task",
+    "ent__suffix",
+    "ent__ext",
+    "ent__mod",
+)
+
+# Max number of items to check membership with a plain set lookup in `filter`.
+_SMALL_ISIN_SIZE = 16
+
 
 class BIDSTable(pd.DataFrame):
     """
@@ -19,57 +70,86 @@ class BIDSTable(pd.DataFrame):
         """
         The dataset (`ds`) subtable.
         """
-        return self.nested["ds"]
+        return self._subtable("ds")
 
     @cached_property
     def ent(self) -> pd.DataFrame:
         """
         The entities (`ent`) subtable.
         """
-        return self.nested["ent"]
+        return self._subtable("ent")
 
     @cached_property
     def meta(self) -> pd.DataFrame:
         """
         The metadata (`meta`) subtable.
         """
-        return self.nested["meta"]
+        return self._subtable("meta")
 
     @cached_property
     def finfo(self) -> pd.DataFrame:
         """
         The file info (`finfo`) subtable.
         """
-        return self.nested["finfo"]
+        return self._subtable("finfo")
+
+    def _subtable(self, group: str) -> pd.DataFrame:
+        """
+        Select the columns of a subtable by prefix and strip the prefix. Equivalent to
+        `self.nested[group]` without building the full nested column index.
+        """
+        prefix = f"{group}__"
+        start = len(prefix)
+        cols = [col for col in self.columns if col.startswith(prefix)]
+        # Cast back to the base class since this is no longer a full BIDS table.
+        sub = pd.DataFrame(self.loc[:, cols])
+        sub.columns = [col[start:] for col in cols]
+        return sub
 
     @cached_property
     def files(self) -> List["BIDSFile"]:
         """
         Convert the table to a list of structured `BIDSFile`s.
         """
-
-        def to_dict(val):
-            if pd.isna(val):
-                return {}
-            return dict(val)
-
-        return [
-            BIDSFile(
-                dataset=row["ds"]["dataset"],
-                root=Path(row["ds"]["dataset_path"]),
-                path=Path(row["finfo"]["file_path"]),
-                entities=BIDSEntities.from_dict(row["ent"]),
-                metadata=to_dict(row["meta"]["json"]),
+        return list(self.iter_files())
+
+    def iter_files(self) -> Iterator["BIDSFile"]:
+        """
+        Iterate over the table as structured `BIDSFile`s, without building the full
+        list up front.
+        """
+        if self.columns.empty:
+            return
+
+        # Pull each column out once rather than boxing every row as a Series.
+        ent_cols = [col for col in self.columns if col.startswith("ent__")]
+        ent_keys = [col[len("ent__") :] for col in ent_cols]
+        ent_rows = zip(*(self[col].tolist() for col in ent_cols))
+        datasets = self["ds__dataset"].tolist()
+        roots = self["ds__dataset_path"].tolist()
+        paths = self["finfo__file_path"].tolist()
+        metas = self["meta__json"].to_numpy()
+        metas_na = pd.isna(metas).tolist()
+        # Only a handful of distinct dataset roots, so share their Path objects.
+        root_paths = {root: Path(root) for root in set(roots)}
+
+        for dataset, root, path, meta, meta_na, ent_values in zip(
+            datasets, roots, paths, metas, metas_na, ent_rows
+        ):
+            yield BIDSFile(
+                dataset,
+                root_paths[root],
+                Path(path),
+                BIDSEntities.from_dict(dict(zip(ent_keys, ent_values))),
+                {} if meta_na else dict(meta),
             )
-            for _, row in self.nested.iterrows()
-        ]
 
     @cached_property
     def datatypes(self) -> List[str]:
         """
         Get all datatypes present in the table.
         """
-        return self.ent["datatype"].unique().tolist()
+        return self._unique("ent__datatype")
 
     @cached_property
     def modalities(self) -> List[str]:
@@ -77,23 +157,34 @@ class BIDSTable(pd.DataFrame):
         Get all modalities present in the table.
         """
         # TODO: Is this the right way to get the modality
-        return self.ent["mod"].unique().tolist()
+        return self._unique("ent__mod")
 
     @cached_property
     def subjects(self) -> List[str]:
         """
         Get all unique subjects in the table.
         """
-        return self.ent["sub"].unique().tolist()
+        return self._unique("ent__sub")
+
+    def _unique(self, column: str) -> List[Any]:
+        # Empty tables have no columns at all.
+        if column not in self.columns:
+            return []
+        return pd.unique(self[column].to_numpy()).tolist()
 
     @cached_property
     def entities(self) -> List[str]:
         """
         Get all entity keys with at least one non-NA entry in the table.
         """
-        entities = self.ent.dropna(axis=1, how="all").columns.tolist()
         special = set(BIDSEntities.special())
-        return [key for key in entities if key not in special]
+        return [
+            col[len("ent__") :]
+            for col in self.columns
+            if col.startswith("ent__")
+            and col[len("ent__") :] not in special
+            and self[col].notna().any()
+        ]
 
     @cached_property
     def flat_meta(self) -> pd.DataFrame:
@@ -106,12 +197,19 @@ class BIDSTable(pd.DataFrame):
         - [`pd.json_normalize`](https://pandas.pydata.org/docs/reference/api/pandas.json_normalize.html):
         more general function in pandas.
         """
-        # Need to replace None with empty dict for max_level=0 to work.
-        metadata = pd.json_normalize(
-            self["meta__json"].map(lambda v: v or {}), max_level=0
-        )
-        metadata.index = self.index
-        return metadata
+        # Build the columns in a single pass rather than going through
+        # `pd.json_normalize`, which is slow for many small records.
+        num_rows = len(self)
+        columns: Dict[str, List[Any]] = {}
+        for ii, val in enumerate(self["meta__json"].to_numpy()):
+            if not val:
+                continue
+            for k, v in val.items():
+                col = columns.get(k)
+                if col is None:
+                    col = columns[k] = [None] * num_rows
+                col[ii] = v
+        return pd.DataFrame(columns, index=self.index)
 
     @cached_property
     def nested(self) -> pd.DataFrame:
@@ -137,7 +235,7 @@ class BIDSTable(pd.DataFrame):
         *,
         items: Optional[Iterable[Any]] = None,
         contains: Optional[str] = None,
-        regex: Optional[str] = None,
+        regex: Optional[Union[str, re.Pattern]] = None,
         func: Optional[Callable[[Any], bool]] = None,
     ) -> "BIDSTable":
         """
@@ -149,7 +247,8 @@ class BIDSTable(pd.DataFrame):
             value: Keep rows with this exact value.
             items: Keep rows whose value is in `items`.
             contains: Keep rows whose value contains `contains` (string only).
-            regex: Keep rows whose value matches `regex` (string only).
+            regex: Keep rows whose value matches `regex` (string only). Can be a
+                precompiled pattern.
             func: Apply an arbitrary function and keep values that evaluate to `True`.
 
         Returns:
@@ -173,6 +272,25 @@ class BIDSTable(pd.DataFrame):
         # create a new one, but to make the 95% of use cases as easy as possible, and
         # empower users to interact with the underlying table using their more powerful
         # tool of choice if necessary.
+        mask = self._filter_mask(
+            key, value, items=items, contains=contains, regex=regex, func=func
+        )
+        return self._take_rows(mask)
+
+    def _filter_mask(
+        self,
+        key: str,
+        value: Optional[Any] = None,
+        *,
+        items: Optional[Iterable[Any]] = None,
+        contains: Optional[str] = None,
+        regex: Optional[Union[str, re.Pattern]] = None,
+        func: Optional[Callable[[Any], bool]] = None,
+    ) -> np.ndarray:
+        """
+        Compute the boolean row mask for a single `filter` query. Missing values are
+        treated as `False`.
+        """
         if sum(k is not None for k in [value, items, contains, regex, func]) != 1:
             raise ValueError(
                 "Exactly one of value, items, contains, regex, or func must not be None"
@@ -182,13 +300,10 @@ class BIDSTable(pd.DataFrame):
             # JSON metadata field
             # NOTE: Assuming all JSON metadata fields are uppercase.
             if key[:1].isupper():
-                col = self.flat_meta[key]
-            # Long name entity
-            elif key in ENTITY_NAMES_TO_KEYS:
-                col = self.ent[ENTITY_NAMES_TO_KEYS[key]]
-            # Any other unprefixed column
+                col = self._meta_column(key)
+            # Long name entity or any other unprefixed column
             else:
-                col = self.flat[key]
+                col = self[self._column_index[key]]
         except KeyError as exc:
             raise KeyError(
                 f"Invalid key {key}; expected a valid BIDS entity or metadata field "
@@ -198,20 +313,75 @@ class BIDSTable(pd.DataFrame):
         if value is not None:
             mask = col == value
         elif items is not None:
-            mask = col.isin(items)
+            mask = _isin_mask(col, items)
         elif contains is not None:
-            mask = col.str.contains(contains)
+            mask = _str_match_mask(col, contains)
         elif regex is not None:
-            mask = col.str.match(regex)
+            mask = _str_match_mask(col, regex, anchored=True)
         else:
             mask = col.apply(func)
-        mask = mask.fillna(False).astype(bool)
+        if isinstance(mask, np.ndarray):
+            return mask
+        return mask.to_numpy(dtype=bool, na_value=False)
+
+    def _take_rows(self, mask: np.ndarray) -> "BIDSTable":
+        """
+        Select rows by boolean mask positionally, skipping label alignment.
+        """
+        return self.iloc[np.flatnonzero(mask)]
+
+    def _clear_caches(self) -> None:
+        """
+        Clear cached properties and metadata columns, which go stale when the table is
+        modified in place.
+        """
+        for name in _CACHED_ATTRS:
+            self.__dict__.pop(name, None)
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self._clear_caches()
 
-        return self.loc[mask]
+    def _update_inplace(self, *args, **kwargs) -> None:
+        # Called by all pandas methods with `inplace=True`, e.g. `sort_values`.
+        super()._update_inplace(*args, **kwargs)
+        self._clear_caches()
+
+    @property
+    def _column_index(self) -> Mapping[str, str]:
+        """
+        Mapping of long entity names and unprefixed column labels to full column
+        labels.
+        """
+        return _build_column_index(tuple(self.columns))
+
+    def _meta_column(self, key: str) -> pd.Series:
+        """
+        Extract a single top-level JSON metadata field as a column, without
+        materializing the full `flat_meta` table. Raises `KeyError` if no row has the
+        field.
+        """
+        if "flat_meta" in self.__dict__:
+            return self.flat_meta[key]
+
+        cache = self.__dict__.setdefault("_meta_col_cache", {})
+        if key not in cache:
+            found = False
+            values = []
+            for val in self["meta__json"].to_numpy():
+                if val and key in val:
+                    found = True
+                    values.append(val[key])
+                else:
+                    values.append(None)
+            if not found:
+                raise KeyError(key)
+            cache[key] = pd.Series(values, index=self.index, name=key)
+        return cache[key]
 
     def filter_multi(self, **filters) -> "BIDSTable":
         """
-        Apply multiple filters to the table sequentially.
+        Apply multiple filters to the table, combining them with logical "and".
 
         Args:
             filters: A mapping of column labels to queries. Each query can either be
@@ -229,13 +399,14 @@ class BIDSTable(pd.DataFrame):
                 RepetitionTime=2.0,
             )
         """
-        tab = self.copy(deep=False)
-
+        # Combine all the masks and slice once, rather than materializing an
+        # intermediate table per filter.
+        mask = np.ones(len(self), dtype=bool)
         for k, query in filters.items():
             if not isinstance(query, dict):
                 query = {"value": query}
-            tab = tab.filter(k, **query)
-        return tab
+            mask &= self._filter_mask(k, **query)
+        return self._take_rows(mask)
 
     def sort_entities(
         self, by: Union[str, List[str]], inplace: bool = False
@@ -255,46 +426,100 @@ class BIDSTable(pd.DataFrame):
             by = [by]
 
         # TODO: what about sorting by other columns, e.g. file_path?
-        def add_prefix(k: str):
-            if k == "dataset":
-                k = f"ds__{k}"
-            elif k in ENTITY_NAMES_TO_KEYS:
-                k = f"ent__{ENTITY_NAMES_TO_KEYS[k]}"
-            else:
-                k = f"ent__{k}"
-            return k
-
-        by = [add_prefix(k) for k in by]
-        out = self.sort_values(by, inplace=inplace)
+        by = [_SORT_COLUMNS.get(k) or f"ent__{k}" for k in by]
         if inplace:
+            self.sort_values(by, inplace=True, kind="stable")
+            self._clear_caches()
             return self
-        return out
+        return self.take(_lexsort_order([self[k] for k in by]))
+
+    def bids_paths(
+        self, prefix: Optional[Union[str, Path]] = None, valid_only: bool = True
+    ) -> pd.Series:
+        """
+        Reconstruct the BIDS path for every row. See `join_bids_paths`.
+        """
+        return join_bids_paths(self, prefix=prefix, valid_only=valid_only)
 
     def with_meta(self, inplace: bool = False) -> "BIDSTable":
         """
         Returns a new BIDS table complete with JSON sidecar metadata.
         """
         out = self if inplace else self.copy()
-        file_paths = out.finfo["file_path"]
-        meta_json = file_paths.apply(lambda path: extract_metadata(path)["json"])
-        out.loc[:, "meta__json"] = meta_json
+        out.loc[:, "meta__json"] = _load_metadata(out["finfo__file_path"])
+        out._clear_caches()
         return out
 
     @classmethod
-    def from_df(cls, df: pd.DataFrame) -> "BIDSTable":
+    def from_df(cls, df: pd.DataFrame, categorical: bool = False) -> "BIDSTable":
         """
         Create a BIDS table from a pandas `DataFrame` generated by `bids2table`.
-        """
+
+        If `categorical` is `True`, low-cardinality string columns (e.g. dataset,
+        subject, datatype) are stored as categoricals to save memory. Note that
+        categories are kept after filtering, so `groupby` and `value_counts` on a
+        filtered table also report values with no rows, and assigning a value that is
+        not already a category raises an error.
+        """
+        if not categorical:
+            return cls(df)
+        df = df.copy(deep=False)
+        for col in _CATEGORICAL_COLUMNS:
+            if col in df.columns and df[col].dtype == object:
+                df[col] = df[col].astype("category")
         return cls(df)
 
     @classmethod
-    def from_parquet(cls, path: Path) -> "BIDSTable":
+    def from_parquet(
+        cls,
+        path: Path,
+        *,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Any] = None,
+        categorical: bool = False,
+    ) -> "BIDSTable":
         """
         Read a BIDS table from a Parquet file or dataset directory generated by
         `bids2table`.
+
+        Args:
+            path: Parquet file or dataset directory.
+            columns: Only read these (prefixed) columns, e.g. `["ent__sub"]`.
+            filters: Row filters pushed down to the Parquet reader, e.g.
+                `[("ent__sub", "=", "04")]`. See `pd.read_parquet`.
+            categorical: store low-cardinality string columns as categoricals. See
+                `from_df`.
+
+        Returns:
+            A BIDS table.
+        """
+        if not has_pyarrow:
+            df = pd.read_parquet(path, columns=columns, filters=filters)
+            return cls.from_df(df, categorical=categorical)
+
+        # Decode row groups in parallel, and release Arrow buffers as the pandas
+        # columns are built to reduce peak memory.
+        table = pq.read_table(path, columns=columns, filters=filters, use_threads=True)
+        df = table.to_pandas(self_destruct=True, split_blocks=True)
+        del table
+        return cls.from_df(df, categorical=categorical)
+
+    def to_arrow(self) -> "pa.Table":
+        """
+        Convert the table to a pyarrow `Table`, e.g. for passing to DuckDB or Polars
+        without a round trip through Parquet.
         """
-        df = pd.read_parquet(path)
-        return cls.from_df(df)
+        if not has_pyarrow:
+            raise ModuleNotFoundError("to_arrow requires pyarrow")
+        return pa.Table.from_pandas(pd.DataFrame(self), preserve_index=False)
+
+    @classmethod
+    def from_arrow(cls, table: "pa.Table", categorical: bool = False) -> "BIDSTable":
+        """
+        Create a BIDS table from a pyarrow `Table` generated by `bids2table`. See
+        `from_df` for `categorical`.
+        """
+        return cls.from_df(table.to_pandas(split_blocks=True), categorical=categorical)
 
     @property
     def _constructor(self):
@@ -303,7 +528,13 @@ class BIDSTable(pd.DataFrame):
         return BIDSTable
 
 
-@dataclass
+_CACHED_ATTRS = (
+    *(k for k, v in vars(BIDSTable).items() if isinstance(v, cached_property)),
+    "_meta_col_cache",
+)
+
+
+@dataclass(**_DATACLASS_KWARGS)
 class BIDSFile:
     """
     A structured BIDS file.
@@ -328,9 +559,12 @@ class BIDSFile:
         return self.path.relative_to(self.root)
 
 
-def flat_to_multi_columns(df: pd.DataFrame, sep: str = "__") -> pd.DataFrame:
+def flat_to_multi_columns(
+    df: pd.DataFrame, sep: str = "__", inplace: bool = False
+) -> pd.DataFrame:
     """
-    Convert a flat column index to a MultiIndex by splitting on `sep`.
+    Convert a flat column index to a MultiIndex by splitting on `sep`. If `inplace`, the
+    columns of `df` are replaced directly, rather than on a shallow copy.
     """
     # Do nothing if already a MultiIndex
     if isinstance(df.columns, pd.MultiIndex):
@@ -342,20 +576,59 @@ def flat_to_multi_columns(df: pd.DataFrame, sep: str = "__") -> pd.DataFrame:
     if len(df.columns) == 0:
         return df
 
-    split_columns = [col.split(sep) for col in df.columns]
-    num_levels = max(map(len, split_columns))
+    if not inplace:
+        df = df.copy(deep=False)
+    df.columns = _split_columns(tuple(df.columns), sep)
+    return df
 
-    def _pad_col(col):
-        return tuple((num_levels - len(col)) * [None] + col)
 
-    df = df.copy(deep=False)
-    df.columns = pd.MultiIndex.from_tuples(map(_pad_col, split_columns))
-    return df
+@lru_cache(maxsize=256)
+def _build_column_index(columns: Tuple[str, ...]) -> Mapping[str, str]:
+    """
+    Build the `BIDSTable._column_index` mapping. Cached at module level so that slices
+    of a table, which are new instances, can share it.
+    """
+    index = {}
+    colset = set(columns)
+    for name, key in ENTITY_NAMES_TO_KEYS.items():
+        col = f"ent__{key}"
+        if col in colset:
+            index[name] = col
+    for col in columns:
+        # Unprefixed columns are indexed under their own label, as in `flat`.
+        index.setdefault(col.partition("__")[2] or col, col)
+    return MappingProxyType(index)
+
+
+@lru_cache(maxsize=256)
+def _split_columns(columns: Tuple[str, ...], sep: str) -> pd.MultiIndex:
+    """
+    Split flat column labels into a MultiIndex. Cached since slices of a table (e.g.
+    from chained filters) all share the same column labels.
+    """
+    # Fast path: vectorized split, valid when every label has the same depth.
+    # Otherwise the last level is padded with NaN and we pad on the left instead.
+    multi = pd.Index(columns).str.split(sep, expand=True)
+    if isinstance(multi, pd.MultiIndex) and not multi.get_level_values(-1).hasnans:
+        return multi
+
+    split_columns = [tuple(col.split(sep)) for col in columns]
+    num_levels = max(map(len, split_columns))
+
+    # Columns usually all have the same depth, in which case there's nothing to pad.
+    if any(len(col) < num_levels for col in split_columns):
+        split_columns = [
+            (num_levels - len(col)) * (None,) + col for col in split_columns
+        ]
+    return pd.MultiIndex.from_tuples(split_columns)
 
 
-def multi_to_flat_columns(df: pd.DataFrame, sep: str = "__") -> pd.DataFrame:
+def multi_to_flat_columns(
+    df: pd.DataFrame, sep: str = "__", inplace: bool = False
+) -> pd.DataFrame:
     """
-    Convert a column MultiIndex to a flat index by joining on `sep`.
+    Convert a column MultiIndex to a flat index by joining on `sep`. If `inplace`, the
+    columns of `df` are replaced directly, rather than on a shallow copy.
     """
     # Do nothing if already flat
     if not isinstance(df.columns, pd.MultiIndex):
@@ -364,11 +637,48 @@ def multi_to_flat_columns(df: pd.DataFrame, sep: str = "__") -> pd.DataFrame:
     columns = df.columns.to_flat_index()
     join_columns = [sep.join(col) for col in columns]
 
-    df = df.copy(deep=False)
+    if not inplace:
+        df = df.copy(deep=False)
     df.columns = pd.Index(join_columns)
     return df
 
 
+def hydrate_metadata(df: pd.DataFrame, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Load the JSON sidecar metadata for each file in a table indexed with
+    `with_meta=False`. Since indexing without metadata is much faster, a typical
+    workflow is to index, filter down to the files of interest, and then hydrate the
+    metadata for the remaining rows only.
+
+    Args:
+        df: table generated by `bids2table`, e.g. a `BIDSTable`.
+        workers: number of threads used to read sidecars concurrently. If `None`, use
+            the `ThreadPoolExecutor` default.
+
+    Returns:
+        A copy of the table with the `meta__json` column populated.
+
+    Example::
+
+        tab = bids2table("path/to/dataset", with_meta=False)
+        tab = hydrate_metadata(tab.filter("task", "rest"))
+    """
+    out = df.copy()
+    out["meta__json"] = _load_metadata(out["finfo__file_path"], workers=workers)
+    return out
+
+
+def _load_metadata(file_paths: pd.Series, workers: Optional[int] = None) -> pd.Series:
+    """
+    Load the JSON sidecar metadata for a series of file paths in a thread pool.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        meta_json = list(
+            executor.map(lambda path: extract_metadata(path)["json"], file_paths)
+        )
+    return pd.Series(meta_json, index=file_paths.index, dtype=object)
+
+
 def join_bids_path(
     row: Union[pd.Series, Dict[str, Any]],
     prefix: Optional[Union[str, Path]] = None,
@@ -394,6 +704,193 @@ def join_bids_path(
     return path
 
 
+def join_bids_paths(
+    df: pd.DataFrame,
+    prefix: Optional[Union[str, Path]] = None,
+    valid_only: bool = True,
+) -> pd.Series:
+    """
+    Reconstruct BIDS paths for all rows of a table. Vectorized equivalent of applying
+    `join_bids_path` to each row, returning a series of path strings.
+
+    Args:
+        df: a `BIDSTable` or `BIDSTable.ent` subtable.
+        prefix: output file prefix path.
+        valid_only: only include valid BIDS entities. Extra entities can only be
+            handled row by row, so if `False` this falls back to `join_bids_path`.
+
+    Example::
+
+        tab = BIDSTable.from_parquet("dataset/index.b2t")
+        paths = join_bids_paths(tab)
+    """
+    if len(df) == 0:
+        return pd.Series([], index=df.index, dtype="string")
+
+    if not valid_only:
+        paths = df.apply(join_bids_path, axis=1, prefix=prefix, valid_only=False)
+        return paths.map(str).astype("string")
+
+    # Filter in case input is the raw dataframe and not the entities group.
+    columns = _filter_columns(df.columns, group="ent")
+    fields_map = _get_fields_map(BIDSEntities)
+    special = set(BIDSEntities.special())
+
+    values: Dict[str, pd.Series] = {}
+    for key, fld in fields_map.items():
+        if key in columns:
+            values[key] = _format_entity_column(df[columns[key]], fld)
+
+    sub = values.get("sub")
+    if sub is None or sub.isna().any():
+        raise TypeError("Missing required entity 'sub'")
+
+    # Join the "{key}-{value}" entities, skipping missing values.
+    name: Optional[pd.Series] = None
+    for key, col in values.items():
+        if key in special:
+            continue
+        # Empty values are formatted as just the key.
+        ent = (key + "-" + col).mask(col.eq("").fillna(False).astype(bool), key)
+        name = ent if name is None else (name + "_" + ent).fillna(name).fillna(ent)
+
+    suffix = values.get("suffix")
+    if suffix is not None:
+        name = name.where(_is_empty(suffix), name + "_" + suffix)
+    ext = values.get("ext")
+    if ext is not None:
+        name = name.where(_is_empty(ext), name + ext)
+
+    sep = os.sep
+    path = "sub-" + sub + sep
+    ses = values.get("ses")
+    if ses is not None:
+        path = path + ("ses-" + ses + sep).mask(_is_empty(ses), "")
+    datatype = values.get("datatype")
+    if datatype is not None:
+        path = path + (datatype + sep).mask(_is_empty(datatype), "")
+    path = path + name
+
+    if prefix:
+        path = os.path.join(os.fspath(prefix), "") + path
+    return path
+
+
+def _format_entity_column(col: pd.Series, fld: _EntityField) -> pd.Series:
+    """
+    Coerce an entity column to its field type, check its values are allowed, and
+    format as strings.
+    """
+    if fld.type is int:
+        col = pd.to_numeric(col).astype("Int64")
+    col = col.astype("string")
+
+    if fld.allowed_values:
+        invalid = col.notna() & ~col.isin(fld.allowed_values)
+        if invalid.any():
+            raise ValueError(
+                f"Value {col[invalid].iloc[0]} for entity {fld.name} isn't one of the "
+                f"allowed values {sorted(fld.allowed_values)}"
+            )
+    return col
+
+
+def _lexsort_order(columns: List[pd.Series]) -> np.ndarray:
+    """
+    Stable sort order over one or more key columns, with missing values last as in
+    `sort_values`. Keys are factorized to integer codes so that object columns with
+    missing values can be sorted with `np.lexsort`. Arrow-backed columns are sorted
+    directly with the pyarrow sort kernel.
+    """
+    if _all_arrow_backed(columns):
+        table = pa.table({f"key{ii}": pa.array(col) for ii, col in enumerate(columns)})
+        # Nulls are placed at the end by default. Passing `null_placement` explicitly
+        # is deprecated in newer pyarrow in favor of per-key placement, which older
+        # versions don't support.
+        sort_keys = [(name, "ascending") for name in table.column_names]
+        indices = pc.sort_indices(table, sort_keys=sort_keys)
+        return indices.to_numpy()
+
+    keys = []
+    # np.lexsort treats the last key as primary.
+    for col in reversed(columns):
+        codes, uniques = pd.factorize(col, sort=True)
+        codes[codes < 0] = len(uniques)
+        keys.append(codes)
+    return np.lexsort(keys)
+
+
+def _all_arrow_backed(columns: List[pd.Series]) -> bool:
+    # pd.ArrowDtype was added in pandas 1.5.
+    arrow_dtype = getattr(pd, "ArrowDtype", None)
+    return (
+        has_pyarrow
+        and arrow_dtype is not None
+        and all(isinstance(col.dtype, arrow_dtype) for col in columns)
+    )
+
+
+def _isin_mask(col: pd.Series, items: Iterable[Any]) -> Union[pd.Series, np.ndarray]:
+    """
+    Membership mask, equivalent to `col.isin(items)`. Small sets of strings, e.g.
+    subject IDs, are checked with a plain set lookup rather than going through pandas.
+    """
+    items = list(items)
+    if len(items) > _SMALL_ISIN_SIZE or not all(isinstance(v, str) for v in items):
+        return col.isin(items)
+    item_set = frozenset(items)
+    values = col.tolist()
+    return np.fromiter((v in item_set for v in values), dtype=bool, count=len(values))
+
+
+def _str_match_mask(
+    col: pd.Series, pattern: Union[str, re.Pattern], anchored: bool = False
+) -> pd.Series:
+    """
+    Regex match mask for a string column, equivalent to `col.str.contains(pattern)`
+    or, if `anchored`, `col.str.match(pattern)`. Uses the pyarrow compute kernels
+    when possible, falling back to pandas for non-string columns, compiled patterns,
+    or patterns the Arrow regex engine doesn't support.
+    """
+    if isinstance(pattern, re.Pattern):
+        # Compiled patterns may carry flags which don't translate to Arrow, so match
+        # them directly.
+        search = pattern.match if anchored else pattern.search
+        return col.map(lambda v: bool(search(v)) if isinstance(v, str) else None)
+
+    if has_pyarrow:
+        arrow_pattern = f"^(?:{pattern})" if anchored else pattern
+        try:
+            arr = pa.array(col.to_numpy(), type=pa.string(), from_pandas=True)
+            mask = pc.match_substring_regex(arr, arrow_pattern)
+            return pd.Series(mask.to_numpy(zero_copy_only=False), index=col.index)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+
+    if anchored:
+        return col.str.match(pattern)
+    return col.str.contains(pattern)
+
+
+def _is_empty(col: pd.Series) -> pd.Series:
+    """
+    Mask of missing or empty string values.
+    """
+    return col.fillna("").eq("").astype(bool)
+
+
+def _filter_columns(
+    columns: Iterable[str], group: str, sep: str = "__"
+) -> Dict[str, str]:
+    """
+    Map field names to table columns for a particular group. Keeps all columns without
+    a group prefix. Column equivalent of `_filter_row`.
+    """
+    columns = tuple(columns)
+    rename = _group_rename(columns, group, sep)
+    return {name: k for name, k in zip(rename, columns) if name is not None}
+
+
 def _filter_row(
     row: Union[pd.Series, Dict[str, Any]], group: str, sep: str = "__"
 ) -> Dict[str, Any]:
@@ -401,16 +898,27 @@ def _filter_row(
     Filter a table row for fields from a particular group. Keeps all fields without a
     group prefix.
     """
+    rename = _group_rename(tuple(row.keys()), group, sep)
+    return {name: v for name, (_, v) in zip(rename, row.items()) if name is not None}
+
+
+@lru_cache(maxsize=256)
+def _group_rename(
+    keys: Tuple[str, ...], group: str, sep: str = "__"
+) -> Tuple[Optional[str], ...]:
+    """
+    Field name for each key in a row with the group prefix stripped, or `None` if the
+    key belongs to a different group. Cached since every row of a table has the same
+    keys.
+    """
     prefix = f"{group}{sep}"
-    return {
-        _removeprefix(k, prefix): v
-        for k, v in row.items()
-        if k.startswith(prefix) or sep not in k
-    }
-
-
-def _removeprefix(s: str, prefix: str) -> str:
-    # same as str.removeprefix(), which was introduced in 3.9
-    if s.startswith(prefix):
-        s = s[len(prefix) :]
-    return s
+    start = len(prefix)
+    rename = []
+    for k in keys:
+        if k.startswith(prefix):
+            rename.append(k[start:])
+        elif sep not in k:
+            rename.append(k)
+        else:
+            rename.append(None)
+    return tuple(rename)
@@ -1,8 +1,12 @@
 import json
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
+import bids2table.entities as entities_module
+import bids2table.extractors.bids as bids_module
 from bids2table import bids2table
 from bids2table.entities import ENTITY_NAMES_TO_KEYS
 
@@ -48,15 +52,69 @@ def test_bids2table(tmp_path: Path, persistent: bool, with_meta: bool):
     assert tab.equals(tab2)
 
 
+def test_bids2table_threads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    root = BIDS_EXAMPLES / "ds001"
+    expected = bids2table(root=root)
+
+    # Track the threads loading metadata concurrently.
+    thread_ids = set()
+    extract_metadata = bids_module.extract_metadata
+
+    def _extract_metadata(*args, **kwargs):
+        thread_ids.add(threading.get_ident())
+        time.sleep(0.005)
+        return extract_metadata(*args, **kwargs)
+
+    monkeypatch.setattr(bids_module, "extract_metadata", _extract_metadata)
+
+    tab = bids2table(root=root, index_path=tmp_path / "index.b2t", threads=4)
+    assert tab.shape == (128, len(ENTITY_NAMES_TO_KEYS) + 8)
+    assert len(thread_ids) > 1
+
+    # Threaded extraction should match the sequential output row for row.
+    assert tab["finfo__file_path"].tolist() == expected["finfo__file_path"].tolist()
+
+
 def test_bids2table_empty(empty_dataset: Path):
     tab = bids2table(root=empty_dataset, persistent=True)
     assert tab.shape == (0, 0)
+    assert tab.files == []
+    assert tab.subjects == []
+    assert tab.entities == []
 
     # Reload from cache
     tab2 = bids2table(root=empty_dataset)
     assert tab.equals(tab2)
 
 
+def test_bids2table_cache_entities(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    root = BIDS_EXAMPLES / "ds001"
+    cache_path = tmp_path / "entities.pkl"
+    monkeypatch.setattr(entities_module, "_entities_disk_cache", None)
+    monkeypatch.setattr(entities_module, "DEFAULT_ENTITIES_CACHE_PATH", cache_path)
+
+    parsed_names = []
+    parse_filename = entities_module._parse_bids_filename
+
+    def _parse_bids_filename(filename, datatype):
+        parsed_names.append(filename)
+        return parse_filename(filename, datatype)
+
+    monkeypatch.setattr(entities_module, "_parse_bids_filename", _parse_bids_filename)
+
+    tab = bids2table(root=root, cache_entities=True)
+    data_names = {Path(p).name for p in tab["finfo__file_path"]}
+    assert data_names <= set(parsed_names)
+    assert cache_path.exists()
+
+    # Second run should parse every data file from the persisted cache.
+    parsed_names.clear()
+    tab2 = bids2table(root=root, cache_entities=True)
+    assert tab.equals(tab2)
+    assert not data_names & set(parsed_names)
+    entities_module.parse_bids_entities.cache_clear()
+
+
 def test_bids2table_nonexist(tmp_path: Path):
     with pytest.raises(FileNotFoundError):
         bids2table(root=tmp_path / "nonexistent_dataset")
@@ -3,10 +3,18 @@ from dataclasses import asdict
 from pathlib import Path
 from typing import Dict, Tuple
 
+import pandas as pd
 import pytest
 from pytest import FixtureRequest
 
-from bids2table.entities import BIDSEntities, parse_bids_entities
+import bids2table.entities as entities_module
+from bids2table.entities import (
+    BIDSEntities,
+    load_entities_cache,
+    parse_bids_entities,
+    parse_bids_entities_batch,
+    save_entities_cache,
+)
 
 EXAMPLES = (
     (
@@ -61,6 +69,29 @@ def test_parse_bids_entities(bids_example: Tuple[str, Dict[str, str], BIDSEntiti
     assert entities == expected
 
 
+def test_parse_bids_entities_batch():
+    paths = pd.Series([ex[0] for ex in EXAMPLES])
+    table = parse_bids_entities_batch(paths)
+    assert table.shape[0] == len(EXAMPLES)
+    for (_, expected, _), (_, row) in zip(EXAMPLES, table.iterrows()):
+        entities = {k: v for k, v in row.items() if not pd.isna(v)}
+        assert entities == expected
+
+
+def test_entities_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(entities_module, "_entities_disk_cache", None)
+    cache_path = tmp_path / "entities.pkl"
+    assert load_entities_cache(cache_path) == 0
+
+    path, expected, _ = EXAMPLES[0]
+    assert parse_bids_entities(path) == expected
+    save_entities_cache(cache_path)
+
+    assert load_entities_cache(cache_path) == 1
+    assert parse_bids_entities(path) == expected
+    parse_bids_entities.cache_clear()
+
+
 def test_bids_entities_from_path(
     bids_example: Tuple[str, Dict[str, str], BIDSEntities]
 ):
@@ -85,6 +116,11 @@ def test_bids_entities_from_dict(
     assert entities == expected
 
 
+def test_bids_entities_from_dict_missing():
+    with pytest.raises(TypeError, match="Missing required entity 'sub' in entities"):
+        BIDSEntities.from_dict({"ses": "1", "suffix": "T1w"})
+
+
 def test_bids_entities_to_path(bids_example: Tuple[str, Dict[str, str], BIDSEntities]):
     path, _, _ = bids_example
     entities = BIDSEntities.from_path(path)
@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import bids2table.extractors.bids as bids_module
+from bids2table.extractors.bids import extract_bids_subdir, extract_bids_subdir_parallel
+from bids2table.extractors.metadata import extract_metadata
+
+
+@pytest.fixture
+def bids_dataset(tmp_path: Path) -> Path:
+    ds_dir = tmp_path / "dummy_bids"
+    ds_dir.mkdir()
+    description = {
+        "Name": "Dummy dataset",
+        "BIDSVersion": "1.8.0",
+        "DatasetType": "raw",
+        "License": "PD",
+        "Authors": [],
+    }
+    with (ds_dir / "dataset_description.json").open("w") as f:
+        json.dump(description, f)
+
+    for sub in ["A01", "A02", "A03", "B01", "B02", "B03", "C01", "C02", "C03"]:
+        anat_dir = ds_dir / f"sub-{sub}" / "anat"
+        anat_dir.mkdir(parents=True)
+        (anat_dir / f"sub-{sub}_T1w.nii.gz").touch()
+        with (anat_dir / f"sub-{sub}_T1w.json").open("w") as f:
+            json.dump({"A": True}, f)
+    return ds_dir
+
+
+@pytest.mark.parametrize("use_threads", [True, False])
+def test_extract_bids_subdir_parallel(bids_dataset: Path, use_threads: bool):
+    expected = {
+        rec["finfo__file_path"]
+        for rec in extract_bids_subdir(bids_dataset, exclude=[])
+        if rec is not None
+    }
+    assert len(expected) == 9
+
+    records = extract_bids_subdir_parallel(
+        bids_dataset, exclude=[], workers=2, use_threads=use_threads
+    )
+    paths = {rec["finfo__file_path"] for rec in records if rec is not None}
+    assert paths == expected
+
+
+@pytest.mark.parametrize("use_threads", [True, False])
+def test_extract_bids_subdir_parallel_order(bids_dataset: Path, use_threads: bool):
+    expected = [
+        rec["finfo__file_path"]
+        for rec in extract_bids_subdir(bids_dataset, exclude=[])
+        if rec is not None
+    ]
+    # Keep fewer pending tasks than sub-directories to exercise the bounded window.
+    records = extract_bids_subdir_parallel(
+        bids_dataset, exclude=[], workers=2, use_threads=use_threads
+    )
+    paths = [rec["finfo__file_path"] for rec in records if rec is not None]
+    assert paths == expected
+
+
+def test_extract_bids_subdir_threads(
+    bids_dataset: Path, monkeypatch: pytest.MonkeyPatch
+):
+    expected = [
+        rec["finfo__file_path"]
+        for rec in extract_bids_subdir(bids_dataset, exclude=[])
+        if rec is not None
+    ]
+
+    # Track the number of concurrent metadata loads.
+    lock = threading.Lock()
+    active = max_active = 0
+
+    def _extract_metadata(*args, **kwargs):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return extract_metadata(*args, **kwargs)
+
+    monkeypatch.setattr(bids_module, "extract_metadata", _extract_metadata)
+
+    records = extract_bids_subdir(bids_dataset, exclude=[], workers=4)
+    paths = [rec["finfo__file_path"] for rec in records if rec is not None]
+    assert paths == expected
+    assert max_active > 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
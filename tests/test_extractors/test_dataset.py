@@ -1,9 +1,10 @@
 import json
+import os
 from pathlib import Path
 
 import pytest
 
-from bids2table.extractors.dataset import extract_dataset
+from bids2table.extractors.dataset import extract_dataset, get_dataset_description
 
 
 @pytest.fixture
@@ -29,5 +30,18 @@ def test_extract_dataset(bids_dataset: Path):
     assert dataset_meta["dataset_description"]["Name"] == "Dummy dataset"
 
 
+def test_get_dataset_description_reload(bids_dataset: Path):
+    desc_path = bids_dataset / "dataset_description.json"
+    assert get_dataset_description(bids_dataset)["Name"] == "Dummy dataset"
+
+    description = json.loads(desc_path.read_text())
+    description["Name"] = "Updated dataset"
+    mtime_ns = desc_path.stat().st_mtime_ns
+    desc_path.write_text(json.dumps(description))
+    # Make sure the mtime changes even on filesystems with coarse timestamps.
+    os.utime(desc_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert get_dataset_description(bids_dataset)["Name"] == "Updated dataset"
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
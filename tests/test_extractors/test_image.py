@@ -4,7 +4,7 @@ import nibabel as nib
 import numpy as np
 import pytest
 
-from bids2table.extractors.image import extract_image_meta
+from bids2table.extractors.image import _cast_header_value, extract_image_meta
 
 
 @pytest.fixture
@@ -25,5 +25,33 @@ def test_extract_image_meta(dummy_image: Path, backend: str):
     assert img_dim[1:5] == [50, 50, 50, 10]
 
 
+def test_extract_image_meta_nifti2(tmp_path: Path):
+    img_path = tmp_path / "img.nii"
+    img = nib.Nifti2Image(np.zeros((4, 5, 6), dtype="float32"), np.diag([2, 2, 2, 1]))
+    img.to_filename(img_path)
+
+    image_meta = extract_image_meta(img_path)
+    assert image_meta["image_header"]["dim"][1:4] == [4, 5, 6]
+    assert np.allclose(image_meta["image_affine"], img.affine)
+
+
+def test_extract_image_meta_extension(tmp_path: Path):
+    img_path = tmp_path / "img.nii.gz"
+    img = nib.Nifti1Image(np.zeros((4, 5, 6), dtype="int16"), np.eye(4))
+    img.header.set_slope_inter(2.0, 1.0)
+    img.header.extensions.append(nib.nifti1.Nifti1Extension(6, b"x" * 1000))
+    img.to_filename(img_path)
+
+    image_meta = extract_image_meta(img_path)
+    header = image_meta["image_header"]
+    assert header is not None
+    assert np.allclose(image_meta["image_affine"], img.affine)
+
+    # Header values should match the fully loaded image.
+    expected = nib.load(img_path).header
+    for key, value in header.items():
+        np.testing.assert_equal(value, _cast_header_value(expected[key]), err_msg=key)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,4 +1,5 @@
 import json
+import math
 from pathlib import Path
 
 import pytest
@@ -59,6 +60,19 @@ def test_extract_metadata(bids_dataset):
     assert rec["json"] == expected_json
 
 
+def test_extract_metadata_nan(bids_dataset):
+    _, image_path, expected_json = bids_dataset
+    sidecar = image_path.parent / "sub-A01_ses-1_T1w.json"
+    # Python's json module writes NaN and arbitrary precision ints by default.
+    with sidecar.open("w") as f:
+        json.dump({"A": float("nan"), "Big": 2**70}, f)
+
+    rec = extract_metadata(image_path)
+    assert math.isnan(rec["json"]["A"])
+    assert rec["json"]["Big"] == 2**70
+    assert rec["json"]["B"] == expected_json["B"]
+
+
 @pytest.mark.parametrize(
     "path,expected",
     [
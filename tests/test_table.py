@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
@@ -9,7 +10,9 @@ from bids2table.table import (
     ENTITY_NAMES_TO_KEYS,
     BIDSTable,
     flat_to_multi_columns,
+    hydrate_metadata,
     join_bids_path,
+    join_bids_paths,
     multi_to_flat_columns,
 )
 
@@ -56,6 +59,7 @@ def test_table(tab: BIDSTable):
 def test_table_files(tab: BIDSTable):
     files = tab.files
     assert len(files) == 128
+    assert list(tab.iter_files()) == files
 
     file = files[2]
     assert file.dataset == "ds001"
@@ -83,6 +87,7 @@ def test_table_files(tab: BIDSTable):
         ("sub", {"items": ["04", "06"]}, 16),
         ("sub", {"contains": "4"}, 16),
         ("sub", {"regex": "0[456]"}, 24),
+        ("sub", {"regex": re.compile("0[456]")}, 24),
         ("RepetitionTime", {"func": lambda v: v <= 2.0}, 48),
     ],
 )
@@ -125,6 +130,72 @@ def test_table_sort_entities(tab: BIDSTable, by: Union[str, List[str]], inplace:
     assert sort_tab.subjects == sorted(tab.subjects)
 
 
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_table_sort_entities_arrow(tab: BIDSTable):
+    pa = pytest.importorskip("pyarrow")
+    if not hasattr(pd, "ArrowDtype"):
+        pytest.skip("pandas ArrowDtype not available")
+
+    arrow_dtype = pd.ArrowDtype(pa.string())
+    arrow_tab = tab.astype({"ent__sub": arrow_dtype, "ent__task": arrow_dtype})
+    sort_tab = arrow_tab.sort_entities(["task", "sub"])
+    expected = tab.sort_entities(["task", "sub"])
+    assert sort_tab.index.tolist() == expected.index.tolist()
+
+    # Missing runs, e.g. for anatomical images, sort last.
+    arrow_tab = arrow_tab.astype({"ent__run": pd.ArrowDtype(pa.int64())})
+    sort_tab = arrow_tab.sort_entities(["run", "sub"])
+    expected = tab.sort_entities(["run", "sub"])
+    assert sort_tab.index.tolist() == expected.index.tolist()
+    assert sort_tab["ent__run"].isna().iloc[-32:].all()
+
+
+def test_table_filter_after_inplace_sort(tab: BIDSTable):
+    tab = tab.copy()
+    tab.files
+    tab.flat_meta
+    tab.filter("RepetitionTime", 2.0)
+
+    tab.sort_entities(["run", "sub"], inplace=True)
+    subtab = tab.filter("suffix", "bold")
+    assert len(subtab) == 48
+    paths = [str(f.path) for f in subtab.files]
+    assert paths == subtab["finfo__file_path"].tolist()
+    pd.testing.assert_frame_equal(subtab.flat_meta, subtab.copy().flat_meta)
+
+    subtab = tab.filter("RepetitionTime", 2.0)
+    assert (subtab["ent__suffix"] == "bold").all()
+
+
+def test_table_filter_unprefixed(tab: BIDSTable):
+    tab = tab.copy()
+    tab["foo"] = "x"
+    assert len(tab.filter("foo", "x")) == 128
+
+
+def test_table_filter_groupby(tab: BIDSTable):
+    subtab = tab.filter("sub", items=["04", "05"])
+    assert subtab["ent__sub"].value_counts().to_dict() == {"04": 8, "05": 8}
+    assert subtab.groupby("ent__sub").size().to_dict() == {"04": 8, "05": 8}
+
+    subtab = subtab.copy()
+    subtab.loc[subtab.index[0], "ent__sub"] = "99"
+    assert subtab["ent__sub"].iloc[0] == "99"
+
+
+def test_table_from_df_categorical(tab: BIDSTable):
+    assert tab["ent__sub"].dtype == object
+
+    cat_tab = BIDSTable.from_df(pd.DataFrame(tab), categorical=True)
+    assert isinstance(cat_tab["ent__sub"].dtype, pd.CategoricalDtype)
+    assert cat_tab["finfo__file_path"].dtype == object
+    subtab = cat_tab.filter("sub", "04")
+    expected = tab.filter("sub", "04")
+    assert subtab["finfo__file_path"].tolist() == expected["finfo__file_path"].tolist()
+    # Unused categories are kept after filtering.
+    assert len(subtab["ent__sub"].cat.categories) == 16
+
+
 def test_table_with_meta(tab_no_meta: BIDSTable):
     tab_no_meta = tab_no_meta.copy()
     tab_with_meta = tab_no_meta.with_meta(inplace=False)
@@ -135,6 +206,48 @@ def test_table_with_meta(tab_no_meta: BIDSTable):
     assert not tab_no_meta["meta__json"].isna().all()
 
 
+def test_hydrate_metadata(tab_no_meta: BIDSTable):
+    subtab = tab_no_meta.filter("sub", "04")
+    subtab_with_meta = hydrate_metadata(subtab, workers=2)
+    assert isinstance(subtab_with_meta, BIDSTable)
+    assert subtab["meta__json"].isna().all()
+    assert not subtab_with_meta["meta__json"].isna().all()
+
+
+def test_table_from_parquet(tmp_path: Path):
+    index_path = tmp_path / "index.b2t"
+    bids2table(
+        BIDS_EXAMPLES / "ds001",
+        index_path=index_path,
+        persistent=True,
+        return_table=False,
+    )
+
+    tab = BIDSTable.from_parquet(index_path)
+    assert len(tab) == 128
+
+    subtab = BIDSTable.from_parquet(
+        index_path,
+        columns=["ent__sub", "finfo__file_path"],
+        filters=[("ent__sub", "=", "04")],
+    )
+    assert isinstance(subtab, BIDSTable)
+    assert subtab.columns.tolist() == ["ent__sub", "finfo__file_path"]
+    assert len(subtab) == len(tab.filter("sub", "04"))
+
+
+def test_table_arrow_roundtrip(tab: BIDSTable):
+    pytest.importorskip("pyarrow")
+    table = tab.to_arrow()
+    assert table.num_rows == len(tab)
+    assert table.column_names == tab.columns.tolist()
+
+    tab2 = BIDSTable.from_arrow(table)
+    assert isinstance(tab2, BIDSTable)
+    assert tab2.shape == tab.shape
+    assert tab2["finfo__file_path"].tolist() == tab["finfo__file_path"].tolist()
+
+
 @pytest.mark.parametrize("sep", ["__", "."])
 def test_flat_to_multi_columns(sep: str):
     df = pd.DataFrame(
@@ -235,5 +348,18 @@ def test_join_bids_path(
     assert Path(path).as_posix() == expected
 
 
+@pytest.mark.parametrize("prefix", [None, "dataset"])
+def test_join_bids_paths(tab: BIDSTable, prefix: Optional[str]):
+    expected = tab.apply(join_bids_path, axis=1, prefix=prefix).map(str)
+    paths = join_bids_paths(tab, prefix=prefix)
+    assert paths.tolist() == expected.tolist()
+
+    paths = join_bids_paths(tab.ent, prefix=prefix)
+    assert paths.tolist() == expected.tolist()
+
+    paths = tab.bids_paths(prefix=prefix)
+    assert paths.tolist() == expected.tolist()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])